@@ -17,7 +17,6 @@ from .core.git_logger import GitLogger
 from .core.init import initialize_project
 from .core.logging import setup_logger
 from .core.runner import TestRunner
-from .generators.test_generator import TestGenerator
 from .utils.exceptions import AgentTestError
 
 app = typer.Typer(
@@ -92,6 +91,11 @@ def run(
     tags: Optional[List[str]] = typer.Option(
         None, "--tag", "-t", help="Run tests with specific tags"
     ),
+    keep_going: bool = typer.Option(
+        False,
+        "--keep-going",
+        help="Report test files that fail to import instead of aborting the run",
+    ),
 ) -> None:
     """Run agent tests."""
     try:
@@ -106,7 +110,11 @@ def run(
 
         # Discover and run tests
         results = runner.run_tests(
-            path=path, pattern=pattern, tags=tags, verbose=verbose
+            path=path,
+            pattern=pattern,
+            tags=tags,
+            verbose=verbose,
+            keep_going=keep_going,
         )
 
         # Display results (enhanced with detailed failure info)
@@ -161,6 +169,9 @@ def generate(
     ),
 ) -> None:
     """Generate test cases automatically using AI."""
+    # Only this command needs the generator and its template engine
+    from .generators.test_generator import TestGenerator
+
     try:
         config = Config.load()
         generator = TestGenerator(config)
@@ -330,6 +341,12 @@ def _display_results(results) -> None:
 
     console.print(table)
 
+    # Display test files that could not be imported
+    if results.discovery_errors:
+        console.print("\n[bold red]📂 DISCOVERY ERRORS[/bold red]")
+        for error in results.discovery_errors:
+            console.print(f"  • [red]{error['file']}:[/red] {error['error']}")
+
     # Display detailed failure information
     if failed_tests:
         console.print("\n[bold red]💥 FAILURE DETAILS[/bold red]")
@@ -25,6 +25,22 @@ class LLMConfig(BaseModel):
     api_base: Optional[str] = Field(None, description="Custom API base URL")
     temperature: float = Field(0.0, description="Temperature for generation")
     max_tokens: Optional[int] = Field(None, description="Max tokens for generation")
+    fast_model: Optional[str] = Field(
+        None, description="Smaller model used to generate tests for simple agents"
+    )
+    requests_per_minute: Optional[int] = Field(
+        None, description="Rate limit for LLM requests during test generation"
+    )
+    cache_responses: bool = Field(
+        False, description="Reuse generated test cases for identical prompts"
+    )
+    cache_dir: str = Field(
+        "~/.cache/agent_test/llm", description="Directory for cached LLM responses"
+    )
+    cache_ttl: Optional[int] = Field(
+        7 * 24 * 60 * 60,
+        description="Seconds before a cached LLM response expires (None: never)",
+    )
 
     @validator("api_key", pre=True, always=True)
     def resolve_api_key(cls, v, values):
@@ -69,8 +85,21 @@ class TestConfig(BaseModel):
         default=["test_*.py"], description="Test file patterns"
     )
     parallel: bool = Field(False, description="Run tests in parallel")
+    max_workers: Optional[int] = Field(
+        None, description="Worker threads for parallel runs (default: auto)"
+    )
     timeout: int = Field(300, description="Test timeout in seconds")
     retry_count: int = Field(0, description="Number of retries for failed tests")
+    discovery_cache: bool = Field(
+        False, description="Cache discovered tests on disk across runs"
+    )
+    analysis_cache: bool = Field(
+        False, description="Cache agent analyses on disk for test generation"
+    )
+    cache_dir: str = Field(
+        ".agenttest/cache",
+        description="Directory for the discovery and analysis caches",
+    )
 
 
 class LoggingConfig(BaseModel):
@@ -13,19 +13,54 @@ from typing import Any, Callable, Dict, List, Optional, Union
 _test_registry: Dict[str, "TestCase"] = {}
 
 
-@dataclass
 class TestCase:
     """Represents a test case discovered by AgentTest."""
 
-    name: str
-    function: Callable
-    criteria: List[str]
-    tags: List[str] = field(default_factory=list)
-    timeout: Optional[int] = None
-    retry_count: int = 0
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    module: Optional[str] = None
-    file_path: Optional[str] = None
+    # Slots avoid a per-instance __dict__ (dataclass slots need Python 3.10)
+    __slots__ = (
+        "name",
+        "function",
+        "criteria",
+        "tags",
+        "timeout",
+        "retry_count",
+        "metadata",
+        "module",
+        "file_path",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        function: Callable,
+        criteria: List[str],
+        tags: Optional[List[str]] = None,
+        timeout: Optional[int] = None,
+        retry_count: int = 0,
+        metadata: Optional[Dict[str, Any]] = None,
+        module: Optional[str] = None,
+        file_path: Optional[str] = None,
+    ):
+        self.name = name
+        self.function = function
+        self.criteria = criteria
+        self.tags = tags if tags is not None else []
+        self.timeout = timeout
+        self.retry_count = retry_count
+        self.metadata = metadata if metadata is not None else {}
+        self.module = module
+        self.file_path = file_path
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"TestCase({fields})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TestCase):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
 
 
 def agent_test(
@@ -111,6 +146,11 @@ def get_registered_tests() -> Dict[str, TestCase]:
     return _test_registry.copy()
 
 
+def get_registered_test_cases() -> List[TestCase]:
+    """Get all registered test cases, without their test IDs."""
+    return list(_test_registry.values())
+
+
 def clear_test_registry() -> None:
     """Clear the test registry (useful for testing)."""
     global _test_registry
@@ -130,17 +170,47 @@ def get_test_case(func: Callable) -> Optional[TestCase]:
 
 
 # Utility functions for test results
-@dataclass
 class TestResult:
     """Represents the result of a test execution."""
 
-    test_name: str
-    passed: bool
-    score: Optional[float] = None
-    duration: float = 0.0
-    error: Optional[str] = None
-    details: Dict[str, Any] = field(default_factory=dict)
-    evaluations: Dict[str, Any] = field(default_factory=dict)
+    __slots__ = (
+        "test_name",
+        "passed",
+        "score",
+        "duration",
+        "error",
+        "details",
+        "evaluations",
+    )
+
+    def __init__(
+        self,
+        test_name: str,
+        passed: bool,
+        score: Optional[float] = None,
+        duration: float = 0.0,
+        error: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        evaluations: Optional[Dict[str, Any]] = None,
+    ):
+        self.test_name = test_name
+        self.passed = passed
+        self.score = score
+        self.duration = duration
+        self.error = error
+        self.details = details if details is not None else {}
+        self.evaluations = evaluations if evaluations is not None else {}
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"TestResult({fields})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TestResult):
+            return NotImplemented
+        return all(
+            getattr(self, slot) == getattr(other, slot) for slot in self.__slots__
+        )
 
 
 @dataclass
@@ -150,14 +220,17 @@ class TestResults:
     test_results: List[TestResult] = field(default_factory=list)
     summary: Dict[str, Any] = field(default_factory=dict)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    discovery_errors: List[Dict[str, str]] = field(default_factory=list)
 
     def add_result(self, result: TestResult) -> None:
         """Add a test result."""
         self.test_results.append(result)
 
     def has_failures(self) -> bool:
-        """Check if any tests failed."""
-        return any(not result.passed for result in self.test_results)
+        """Check if any tests failed or any test file failed to load."""
+        return bool(self.discovery_errors) or any(
+            not result.passed for result in self.test_results
+        )
 
     def get_pass_rate(self) -> float:
         """Get the pass rate as a percentage."""
@@ -197,6 +270,7 @@ class TestResults:
         data = {
             "summary": self.get_summary(),
             "metadata": self.metadata,
+            "discovery_errors": self.discovery_errors,
             "test_results": [
                 {
                     "test_name": result.test_name,
@@ -5,10 +5,11 @@ Tracks test results with git commit information for regression analysis.
 """
 
 import json
+import os
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 try:
     import git
@@ -17,10 +18,67 @@ try:
 except ImportError:
     GIT_AVAILABLE = False
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import ijson
+
+    IJSON_AVAILABLE = True
+except ImportError:
+    IJSON_AVAILABLE = False
+
 from ..utils.exceptions import GitError
 from .config import Config
 from .decorators import TestResults
 
+# Compacted snapshot of recent runs, plus an append-only journal of new runs
+INDEX_FILE = "index.json"
+INDEX_JOURNAL_FILE = "index.jsonl"
+JOURNAL_COMPACT_BYTES = 64 * 1024
+
+# Top-level result file fields needed to build an index entry
+INDEX_ENTRY_FIELDS = ("timestamp", "git_info", "summary")
+
+
+def _json_dumps(obj: Any, indent: bool = True) -> bytes:
+    """Serialize to UTF-8 JSON, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except TypeError:
+            # e.g. integers wider than 64 bits; the stdlib encoder handles these
+            pass
+
+    return json.dumps(obj, indent=2 if indent else None, default=str).encode("utf-8")
+
+
+def _write_file(path: Path, data: bytes) -> None:
+    """Write an encoded buffer to a file with unbuffered os.write calls."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+    fd = os.open(path, flags, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
 
 class GitLogger:
     """Git-aware logger for test results."""
@@ -32,6 +90,7 @@ class GitLogger:
 
         # Initialize git repo if available
         self.repo = None
+        self._commit_info_cache: Optional[Tuple[str, Dict[str, Any]]] = None
         if GIT_AVAILABLE and config.logging.git_aware:
             try:
                 self.repo = git.Repo(search_parent_directories=True)
@@ -78,6 +137,7 @@ class GitLogger:
         try:
             # Get current commit
             commit = self.repo.head.commit
+            commit_info = self._get_commit_info(commit)
 
             # Get branch name
             try:
@@ -90,34 +150,56 @@ class GitLogger:
             changed_files = [item.a_path for item in self.repo.index.diff(None)]
             untracked_files = self.repo.untracked_files
 
-            # Get recent commits
-            recent_commits = []
-            for commit_obj in self.repo.iter_commits(max_count=5):
-                recent_commits.append(
-                    {
-                        "hash": commit_obj.hexsha[:8],
-                        "message": commit_obj.message.strip(),
-                        "author": str(commit_obj.author),
-                        "date": commit_obj.committed_datetime.isoformat(),
-                    }
-                )
-
             return {
-                "commit_hash": commit.hexsha,
-                "commit_hash_short": commit.hexsha[:8],
+                "commit_hash": commit_info["commit_hash"],
+                "commit_hash_short": commit_info["commit_hash_short"],
                 "branch": branch,
-                "commit_message": commit.message.strip(),
-                "author": str(commit.author),
-                "commit_date": commit.committed_datetime.isoformat(),
+                "commit_message": commit_info["commit_message"],
+                "author": commit_info["author"],
+                "commit_date": commit_info["commit_date"],
                 "changed_files": changed_files,
                 "untracked_files": untracked_files,
                 "is_dirty": self.repo.is_dirty(),
-                "recent_commits": recent_commits,
+                "recent_commits": commit_info["recent_commits"],
             }
 
         except Exception as e:
             return {"error": f"Failed to get git info: {str(e)}"}
 
+    def _get_commit_info(self, commit: Any) -> Dict[str, Any]:
+        """
+        Get information about the HEAD commit and its recent history.
+
+        Cached by commit hash, since it only changes when HEAD moves. Working
+        tree status is not cached as it can change without a new commit.
+        """
+        if self._commit_info_cache and self._commit_info_cache[0] == commit.hexsha:
+            return self._commit_info_cache[1]
+
+        # Get recent commits
+        recent_commits = []
+        for commit_obj in self.repo.iter_commits(commit, max_count=5):
+            recent_commits.append(
+                {
+                    "hash": commit_obj.hexsha[:8],
+                    "message": commit_obj.message.strip(),
+                    "author": str(commit_obj.author),
+                    "date": commit_obj.committed_datetime.isoformat(),
+                }
+            )
+
+        commit_info = {
+            "commit_hash": commit.hexsha,
+            "commit_hash_short": commit.hexsha[:8],
+            "commit_message": commit.message.strip(),
+            "author": str(commit.author),
+            "commit_date": commit.committed_datetime.isoformat(),
+            "recent_commits": recent_commits,
+        }
+
+        self._commit_info_cache = (commit.hexsha, commit_info)
+        return commit_info
+
     def _save_log_entry(self, log_entry: Dict[str, Any]) -> None:
         """Save log entry to file."""
         # Create filename with timestamp and commit hash
@@ -127,21 +209,10 @@ class GitLogger:
         filename = f"{timestamp.strftime('%Y%m%d_%H%M%S')}_{commit_hash}.json"
         filepath = self.results_dir / filename
 
-        with open(filepath, "w") as f:
-            json.dump(log_entry, f, indent=2, default=str)
+        _write_file(filepath, _json_dumps(log_entry))
 
     def _update_index(self, log_entry: Dict[str, Any]) -> None:
-        """Update the index file with latest results."""
-        index_path = self.results_dir / "index.json"
-
-        # Load existing index
-        if index_path.exists():
-            with open(index_path, "r") as f:
-                index = json.load(f)
-        else:
-            index = {"runs": [], "by_commit": {}, "by_branch": {}}
-
-        # Add new entry
+        """Record the latest run in the index journal."""
         entry_summary = {
             "timestamp": log_entry["timestamp"],
             "commit_hash": log_entry["git_info"].get("commit_hash"),
@@ -154,32 +225,80 @@ class GitLogger:
             ),
         }
 
-        # Add to runs list
-        index["runs"].append(entry_summary)
+        # Append a single line instead of rewriting the whole index
+        journal_path = self.results_dir / INDEX_JOURNAL_FILE
+        with open(journal_path, "ab") as f:
+            f.write(_json_dumps(entry_summary, indent=False) + b"\n")
 
-        # Sort by timestamp (most recent first)
-        index["runs"].sort(key=lambda x: x["timestamp"], reverse=True)
+        # Fold the journal into index.json once it grows large
+        if journal_path.stat().st_size > JOURNAL_COMPACT_BYTES:
+            self._compact_index()
+
+    def _add_to_index(
+        self, index: Dict[str, Any], entry_summary: Dict[str, Any]
+    ) -> None:
+        """Add a run summary to an in-memory index."""
+        # Insert into runs list, which is kept sorted most recent first.
+        # Binary search by hand since bisect only takes a key on Python 3.10+.
+        runs = index["runs"]
+        timestamp = entry_summary["timestamp"]
+        lo, hi = 0, len(runs)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if runs[mid]["timestamp"] >= timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        runs.insert(lo, entry_summary)
 
         # Limit to last 100 runs
-        index["runs"] = index["runs"][:100]
+        del runs[100:]
 
         # Index by commit hash
-        commit_hash = log_entry["git_info"].get("commit_hash")
+        commit_hash = entry_summary.get("commit_hash")
         if commit_hash:
             if commit_hash not in index["by_commit"]:
                 index["by_commit"][commit_hash] = []
             index["by_commit"][commit_hash].append(entry_summary)
 
         # Index by branch
-        branch = log_entry["git_info"].get("branch")
+        branch = entry_summary.get("branch")
         if branch:
             if branch not in index["by_branch"]:
                 index["by_branch"][branch] = []
             index["by_branch"][branch].append(entry_summary)
 
-        # Save updated index
-        with open(index_path, "w") as f:
-            json.dump(index, f, indent=2, default=str)
+    def _load_index(self) -> Dict[str, Any]:
+        """Load the index snapshot and replay any journaled runs on top of it."""
+        index_path = self.results_dir / INDEX_FILE
+        journal_path = self.results_dir / INDEX_JOURNAL_FILE
+
+        # Load existing index
+        if index_path.exists():
+            with open(index_path, "rb") as f:
+                index = _json_loads(f.read())
+            index.setdefault("runs", [])
+            index.setdefault("by_commit", {})
+            index.setdefault("by_branch", {})
+        else:
+            index = {"runs": [], "by_commit": {}, "by_branch": {}}
+
+        if journal_path.exists():
+            with open(journal_path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        self._add_to_index(index, _json_loads(line))
+
+        return index
+
+    def _compact_index(self) -> None:
+        """Merge the index journal into index.json and truncate the journal."""
+        index = self._load_index()
+
+        index_path = self.results_dir / INDEX_FILE
+        _write_file(index_path, _json_dumps(index))
+
+        (self.results_dir / INDEX_JOURNAL_FILE).unlink()
 
     def get_history(
         self,
@@ -188,13 +307,7 @@ class GitLogger:
         branch: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Get test run history."""
-        index_path = self.results_dir / "index.json"
-
-        if not index_path.exists():
-            return []
-
-        with open(index_path, "r") as f:
-            index = json.load(f)
+        index = self._load_index()
 
         runs = index.get("runs", [])
 
@@ -287,25 +400,24 @@ class GitLogger:
             test["test_name"]: test for test in target_results.get("test_results", [])
         }
 
-        # Find new and removed tests
-        base_test_names = set(base_tests.keys())
-        target_test_names = set(target_tests.keys())
-
-        comparison["new_tests"] = list(target_test_names - base_test_names)
-        comparison["removed_tests"] = list(base_test_names - target_test_names)
+        # Find new and removed tests (key views support set operations directly)
+        comparison["new_tests"] = list(target_tests.keys() - base_tests.keys())
+        comparison["removed_tests"] = list(base_tests.keys() - target_tests.keys())
 
         # Compare common tests
-        common_tests = base_test_names & target_test_names
+        common_tests = base_tests.keys() & target_tests.keys()
         comparison["metadata"]["total_compared"] = len(common_tests)
 
-        for test_name in common_tests:
-            base_test = base_tests[test_name]
-            target_test = target_tests[test_name]
+        filter_lower = filter_by.lower() if filter_by else None
 
+        for test_name in common_tests:
             # Apply test name filter if specified
-            if filter_by and filter_by.lower() not in test_name.lower():
+            if filter_lower and filter_lower not in test_name.lower():
                 continue
 
+            base_test = base_tests[test_name]
+            target_test = target_tests[test_name]
+
             test_change = {
                 "test_name": test_name,
                 "base_passed": base_test["passed"],
@@ -467,13 +579,7 @@ class GitLogger:
 
     def _get_results_for_ref(self, ref: str) -> Optional[Dict[str, Any]]:
         """Get test results for a specific git reference (commit or branch)."""
-        index_path = self.results_dir / "index.json"
-
-        if not index_path.exists():
-            return None
-
-        with open(index_path, "r") as f:
-            index = json.load(f)
+        index = self._load_index()
 
         # Try to find by commit hash first
         runs = index.get("runs", [])
@@ -488,8 +594,8 @@ class GitLogger:
                 if filename:
                     filepath = self.results_dir / filename
                     if filepath.exists():
-                        with open(filepath, "r") as f:
-                            return json.load(f)
+                        with open(filepath, "rb") as f:
+                            return _json_loads(f.read())
 
         return None
 
@@ -497,12 +603,14 @@ class GitLogger:
         """Clean up old test result files."""
         cutoff_time = time.time() - (days * 24 * 60 * 60)
 
-        for file_path in self.results_dir.glob("*.json"):
-            if file_path.name == "index.json":
-                continue
+        # DirEntry.stat() reuses the directory read instead of a stat per path
+        with os.scandir(self.results_dir) as entries:
+            for entry in entries:
+                if entry.name == INDEX_FILE or not entry.name.endswith(".json"):
+                    continue
 
-            if file_path.stat().st_mtime < cutoff_time:
-                file_path.unlink()
+                if entry.is_file() and entry.stat().st_mtime < cutoff_time:
+                    os.unlink(entry.path)
 
         # Rebuild index after cleanup
         self._rebuild_index()
@@ -512,12 +620,11 @@ class GitLogger:
         index = {"runs": [], "by_commit": {}, "by_branch": {}}
 
         for file_path in self.results_dir.glob("*.json"):
-            if file_path.name == "index.json":
+            if file_path.name == INDEX_FILE:
                 continue
 
             try:
-                with open(file_path, "r") as f:
-                    log_entry = json.load(f)
+                log_entry = self._load_index_fields(file_path)
 
                 entry_summary = {
                     "timestamp": log_entry["timestamp"],
@@ -536,7 +643,27 @@ class GitLogger:
         # Sort by timestamp
         index["runs"].sort(key=lambda x: x["timestamp"], reverse=True)
 
-        # Save rebuilt index
-        index_path = self.results_dir / "index.json"
-        with open(index_path, "w") as f:
-            json.dump(index, f, indent=2, default=str)
+        # Save rebuilt index; it already covers every journaled run
+        index_path = self.results_dir / INDEX_FILE
+        _write_file(index_path, _json_dumps(index))
+
+        journal_path = self.results_dir / INDEX_JOURNAL_FILE
+        if journal_path.exists():
+            journal_path.unlink()
+
+    def _load_index_fields(self, file_path: Path) -> Dict[str, Any]:
+        """Load the fields needed for the index from a result file."""
+        if not IJSON_AVAILABLE:
+            with open(file_path, "rb") as f:
+                return _json_loads(f.read())
+
+        # Stream top-level keys and stop before the (large) test_results array
+        fields: Dict[str, Any] = {}
+        with open(file_path, "rb") as f:
+            for key, value in ijson.kvitems(f, "", use_float=True):
+                if key in INDEX_ENTRY_FIELDS:
+                    fields[key] = value
+                    if len(fields) == len(INDEX_ENTRY_FIELDS):
+                        break
+
+        return fields
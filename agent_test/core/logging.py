@@ -96,8 +96,8 @@ class AgentTestLogger:
                 kwargs.get("test_name"),
             )
 
-    def test_started(self, test_name: str, total_tests: int):
-        """Log test execution start."""
+    def test_started(self, test_name: str, total_tests: Optional[int] = None):
+        """Log test execution start; total_tests is None when not yet known."""
         self.current_test = test_name
         self.total_tests = total_tests
 
@@ -119,7 +119,11 @@ class AgentTestLogger:
             "duration": duration,
             "score": score,
             "error": error,
-            "progress": f"{self.completed_tests}/{self.total_tests}",
+            "progress": (
+                f"{self.completed_tests}/{self.total_tests}"
+                if self.total_tests
+                else str(self.completed_tests)
+            ),
         }
 
         if passed:
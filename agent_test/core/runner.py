@@ -4,19 +4,139 @@ Test runner for AgentTest.
 Handles test discovery, execution, and evaluation.
 """
 
+import fnmatch
 import importlib
+import json
+import os
+import re
 import sys
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
+from ..evaluators.base import BaseEvaluator
 from ..evaluators.registry import EvaluatorRegistry
 from ..utils.exceptions import TestDiscoveryError
 from .config import Config
-from .decorators import TestCase, TestResult, TestResults, get_registered_tests
+from .decorators import (
+    TestCase,
+    TestResult,
+    TestResults,
+    clear_test_registry,
+    get_registered_test_cases,
+)
 from .logging import get_logger, setup_logger
 
+DISCOVERY_CACHE_FILE = "discovery.json"
+DISCOVERY_CACHE_VERSION = 1
+
+# Below this many scored criteria the pure-Python weighted average is faster
+VECTORIZE_MIN_SCORES = 8
+
+
+@lru_cache(maxsize=64)
+def _compile_file_patterns(patterns: Tuple[str, ...]) -> "re.Pattern":
+    """Compile file name glob patterns into a single alternation regex."""
+    return re.compile(
+        "|".join(fnmatch.translate(os.path.normcase(pat)) for pat in patterns)
+    )
+
+
+# Entries added by _prepend_sys_path, with how many active callers need each one
+_sys_path_refs: Dict[str, int] = {}
+_sys_path_lock = threading.Lock()
+
+
+@contextmanager
+def _prepend_sys_path(directories: List[Path]) -> Iterator[None]:
+    """
+    Temporarily add directories to the front of sys.path.
+
+    Entries are reference counted, so an entry added by one caller (say the
+    discovery pass) stays until every overlapping caller (say a lazy import
+    on a worker thread) has exited, whichever finishes first.
+    """
+    acquired = []
+    with _sys_path_lock:
+        added = []
+        for directory in directories:
+            path = str(directory)
+            if path in acquired:
+                continue
+            if path in _sys_path_refs:
+                _sys_path_refs[path] += 1
+            elif path not in sys.path:
+                _sys_path_refs[path] = 1
+                added.append(path)
+            else:
+                # Pre-existing entries are left alone
+                continue
+            acquired.append(path)
+
+        sys.path[:0] = added
+    try:
+        yield
+    finally:
+        with _sys_path_lock:
+            for path in acquired:
+                _sys_path_refs[path] -= 1
+                if not _sys_path_refs[path]:
+                    del _sys_path_refs[path]
+                    if path in sys.path:
+                        sys.path.remove(path)
+
+
+class _TestOutput:
+    """Verbose output for one test, optionally buffered until the test ends."""
+
+    __slots__ = ("_write", "_lines")
+
+    def __init__(self, buffered: bool = False):
+        # Bind the write method once; parallel tests buffer so output doesn't interleave
+        self._lines: Optional[List[str]] = [] if buffered else None
+        self._write = self._lines.append if buffered else sys.stdout.write
+
+    def write(self, line: str) -> None:
+        """Write a line of verbose output."""
+        self._write(line + "\n")
+
+    def write_traceback(self, formatted: str) -> None:
+        """Write an already formatted traceback verbatim."""
+        if self._lines is None:
+            # Unbuffered tracebacks go to stderr, as traceback.print_exc() does
+            sys.stderr.write(formatted)
+        else:
+            self._write(formatted)
+
+    def flush(self) -> None:
+        """Write out any buffered lines in a single call."""
+        if self._lines:
+            sys.stdout.write("".join(self._lines))
+            sys.stdout.flush()
+            self._lines.clear()
+
+
+class _LazyTestFunction:
+    """Test function stand-in that imports its module on first call."""
+
+    __slots__ = ("runner", "test_file", "name")
+
+    def __init__(self, runner: "TestRunner", test_file: Path, name: str):
+        self.runner = runner
+        self.test_file = test_file
+        self.name = name
+
+    def __call__(self, *args, **kwargs) -> Any:
+        for test_case in self.runner._import_and_discover(self.test_file):
+            if test_case.name == self.name:
+                return test_case.function(*args, **kwargs)
+        raise TestDiscoveryError(f"Test {self.name} not found in {self.test_file}")
+
 
 class TestRunner:
     """Main test runner for AgentTest."""
@@ -26,12 +146,22 @@ class TestRunner:
         self.evaluator_registry = EvaluatorRegistry(config)
         self.logger = get_logger()
 
+        # Discovered tests per (file path, mtime), so unchanged files aren't re-executed
+        self._discovery_cache: Dict[Tuple[str, int], List[TestCase]] = {}
+
+        # Test modules register into a global registry, so imports are serialized
+        self._import_lock = threading.Lock()
+
+        # Evaluator and scoring weight per criterion, resolved once per run
+        self._evaluator_cache: Dict[str, Tuple[Optional[BaseEvaluator], float]] = {}
+
     def run_tests(
         self,
         path: Optional[Path] = None,
         pattern: str = "test_*.py",
         tags: Optional[List[str]] = None,
         verbose: bool = False,
+        keep_going: bool = False,
     ) -> TestResults:
         """
         Run tests based on discovery criteria.
@@ -41,9 +171,17 @@ class TestRunner:
             pattern: File pattern for test discovery
             tags: Only run tests with these tags
             verbose: Enable verbose output
+            keep_going: Record test files that fail to import and run the rest,
+                instead of aborting the run
 
         Returns:
             TestResults object containing all results
+
+        Raises:
+            TestDiscoveryError: If a test file fails to import and keep_going is
+                False. Tests are run as they are discovered, so tests from files
+                found earlier may already have run; no further tests are started
+                and their results are discarded.
         """
         # Setup logger for this run
         self.logger = setup_logger(verbose=verbose, quiet=False)
@@ -59,39 +197,50 @@ class TestRunner:
         else:
             self.logger.discovery_started("test directories", pattern)
 
-        test_cases = self.discover_tests(path, pattern)
-
-        # Filter by tags if specified
-        if tags:
-            test_cases = [
-                tc for tc in test_cases if any(tag in tc.tags for tag in tags)
-            ]
-
-        self.logger.discovery_completed(len(test_cases), len(test_cases))
+        results = TestResults()
 
-        if not test_cases:
-            self.logger.warning("DISCOVERY", "No tests found matching criteria")
-            return TestResults()
+        # Tests are executed as they are discovered, one module at a time
+        test_cases = self.iter_discover_tests(
+            path, pattern, tags, errors=results.discovery_errors if keep_going else None
+        )
 
-        results = TestResults()
+        self._evaluator_cache.clear()
 
         # Execute tests
-        for i, test_case in enumerate(test_cases):
-            self.logger.test_started(test_case.name, len(test_cases))
-
-            result = self.execute_test(test_case, verbose)
-            results.add_result(result)
-
-            # Log test completion
-            self.logger.test_completed(
-                test_case.name,
-                result.passed,
-                result.duration,
-                result.score,
-                result.error,
-            )
+        if self.config.testing.parallel:
+            # Discovery finishes, and restores sys.path, while tests are still
+            # running, so the test directories are kept on it until they finish
+            test_dirs, _ = self._resolve_test_dirs(path, pattern)
+            with _prepend_sys_path(test_dirs):
+                for result in self._execute_parallel(test_cases, verbose):
+                    results.add_result(result)
+        else:
+            for test_case in test_cases:
+                self._resolve_criteria(test_case)
+                # The total isn't known until discovery finishes
+                self.logger.test_started(test_case.name)
+
+                result = self.execute_test(test_case, verbose)
+                results.add_result(result)
+
+                # Log test completion
+                self.logger.test_completed(
+                    test_case.name,
+                    result.passed,
+                    result.duration,
+                    result.score,
+                    result.error,
+                )
+
+        test_count = len(results.test_results)
+        self.logger.discovery_completed(test_count, test_count)
+
+        if not test_count:
+            self.logger.warning("DISCOVERY", "No tests found matching criteria")
+            return TestResults(discovery_errors=results.discovery_errors)
 
-        # Add metadata
+        # Add metadata. The config is serialized per run (a few microseconds),
+        # since it can change between runs and each result needs its own copy
         results.metadata = {
             "config": self.config.dict(),
             "timestamp": time.time(),
@@ -105,6 +254,52 @@ class TestRunner:
 
         return results
 
+    def _execute_parallel(
+        self, test_cases: Iterable[TestCase], verbose: bool = False
+    ) -> List[TestResult]:
+        """
+        Execute test cases concurrently on a thread pool.
+
+        Agent tests are usually dominated by LLM/network I/O, which releases
+        the GIL. Tests are submitted as they are discovered, logging happens on
+        the calling thread, and results are returned in discovery order.
+        """
+        with ThreadPoolExecutor(
+            max_workers=self.config.testing.max_workers
+        ) as executor:
+            futures = {}
+            try:
+                for i, test_case in enumerate(test_cases):
+                    self._resolve_criteria(test_case)
+                    # The total isn't known until discovery finishes
+                    self.logger.test_started(test_case.name)
+                    future = executor.submit(
+                        self.execute_test, test_case, verbose, True
+                    )
+                    futures[future] = i
+            except TestDiscoveryError:
+                # The run is aborted, so don't start tests still waiting for
+                # a worker; only those already running are waited for
+                for future in futures:
+                    future.cancel()
+                raise
+
+            results: List[Optional[TestResult]] = [None] * len(futures)
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+
+                # Log test completion
+                self.logger.test_completed(
+                    result.test_name,
+                    result.passed,
+                    result.duration,
+                    result.score,
+                    result.error,
+                )
+
+        return results
+
     def discover_tests(
         self, path: Optional[Path] = None, pattern: str = "test_*.py"
     ) -> List[TestCase]:
@@ -118,6 +313,83 @@ class TestRunner:
         Returns:
             List of discovered test cases
         """
+        return list(self.iter_discover_tests(path, pattern))
+
+    def iter_discover_tests(
+        self,
+        path: Optional[Path] = None,
+        pattern: str = "test_*.py",
+        tags: Optional[List[str]] = None,
+        errors: Optional[List[Dict[str, str]]] = None,
+    ) -> Iterator[TestCase]:
+        """
+        Lazily discover test cases, importing one test file at a time.
+
+        The test directories are only on sys.path while the iterator is being
+        consumed; callers that run tests after it is exhausted must keep them
+        on it themselves.
+
+        Args:
+            path: Path to search for tests
+            pattern: File pattern to match
+            tags: Only yield tests with these tags
+            errors: If given, files that fail to import are appended here as
+                {"file": ..., "error": ...} and discovery continues
+
+        Yields:
+            Discovered test cases
+
+        Raises:
+            TestDiscoveryError: If a test file fails to import and no errors
+                list was given
+        """
+        tag_set = frozenset(tags) if tags else None
+        test_dirs, patterns = self._resolve_test_dirs(path, pattern)
+
+        # Metadata of previously discovered tests, keyed by file path
+        disk_cache = (
+            self._load_discovery_cache()
+            if self.config.testing.discovery_cache
+            else None
+        )
+        disk_cache_updated = False
+
+        # Put all test directories on sys.path once for the whole discovery pass
+        with _prepend_sys_path(test_dirs):
+            for test_dir in test_dirs:
+                # Find test files
+                test_files = self._find_test_files(test_dir, patterns)
+
+                # Import modules and discover tests
+                for test_file in test_files:
+                    try:
+                        if disk_cache is None:
+                            module_tests = self._import_and_discover(test_file)
+                        else:
+                            module_tests, updated = self._discover_cached(
+                                test_file, disk_cache
+                            )
+                            disk_cache_updated = disk_cache_updated or updated
+                    except Exception as e:
+                        message = f"Failed to discover tests in {test_file}: {e}"
+                        if errors is None:
+                            raise TestDiscoveryError(message)
+
+                        self.logger.error("DISCOVERY", message)
+                        errors.append({"file": str(test_file), "error": str(e)})
+                        continue
+
+                    for test_case in module_tests:
+                        if tag_set is None or not tag_set.isdisjoint(test_case.tags):
+                            yield test_case
+
+        if disk_cache_updated:
+            self._save_discovery_cache(disk_cache)
+
+    def _resolve_test_dirs(
+        self, path: Optional[Path], pattern: str
+    ) -> Tuple[List[Path], List[str]]:
+        """Resolve the existing test directories and file patterns to search."""
         if path is None:
             # Use configured test directories
             test_dirs = [Path(d) for d in self.config.testing.test_dirs]
@@ -129,41 +401,154 @@ class TestRunner:
             # Directory
             test_dirs = [path]
 
-        test_cases = []
-
-        for test_dir in test_dirs:
-            if not test_dir.exists():
-                continue
-
-            # Find test files
-            if pattern.endswith(".py"):
-                # Specific file pattern
-                test_files = list(test_dir.glob(pattern))
+        if pattern.endswith(".py"):
+            # Specific file pattern
+            patterns = [pattern]
+        else:
+            # Multiple patterns
+            patterns = self.config.testing.test_patterns
+
+        return [test_dir for test_dir in test_dirs if test_dir.exists()], patterns
+
+    def _find_test_files(self, test_dir: Path, patterns: List[str]) -> List[Path]:
+        """Find files directly in test_dir matching any of the glob patterns."""
+        test_files = []
+        name_patterns = []
+
+        for pat in patterns:
+            if "/" in pat or os.sep in pat:
+                # Path-style patterns still need pathlib's glob
+                test_files.extend(test_dir.glob(pat))
+            elif not any(char in pat for char in "*?["):
+                # Literal file name, no need to list the directory
+                candidate = test_dir / pat
+                if candidate.exists():
+                    test_files.append(candidate)
             else:
-                # Multiple patterns
-                test_files = []
-                for pat in self.config.testing.test_patterns:
-                    test_files.extend(test_dir.glob(pat))
-
-            # Import modules and discover tests
-            for test_file in test_files:
-                try:
-                    module_tests = self._import_and_discover(test_file)
-                    test_cases.extend(module_tests)
-                except Exception as e:
-                    raise TestDiscoveryError(
-                        f"Failed to discover tests in {test_file}: {e}"
-                    )
+                name_patterns.append(pat)
+
+        if name_patterns:
+            # One directory listing and one regex for all name patterns
+            name_regex = _compile_file_patterns(tuple(name_patterns))
+            with os.scandir(test_dir) as entries:
+                for entry in entries:
+                    if name_regex.match(os.path.normcase(entry.name)):
+                        test_files.append(test_dir / entry.name)
 
-        return test_cases
+        return test_files
 
     def _import_and_discover(self, test_file: Path) -> List[TestCase]:
         """Import a test file and discover test functions."""
-        # Add the test file's directory to Python path
-        test_dir = test_file.parent
-        if str(test_dir) not in sys.path:
-            sys.path.insert(0, str(test_dir))
+        cache_key = (str(test_file), test_file.stat().st_mtime_ns)
+        cached_tests = self._discovery_cache.get(cache_key)
+        if cached_tests is not None:
+            return list(cached_tests)
+
+        # The directory stays on sys.path until this import finishes, even if
+        # discovery or another thread added it and exits first
+        with self._import_lock, _prepend_sys_path([test_file.parent]):
+            cached_tests = self._discovery_cache.get(cache_key)
+            if cached_tests is not None:
+                return list(cached_tests)
+            return self._load_test_module(test_file, cache_key)
+
+    def _discover_cached(
+        self, test_file: Path, disk_cache: Dict[str, Any]
+    ) -> Tuple[List[TestCase], bool]:
+        """
+        Discover tests using the on-disk cache.
+
+        Unchanged files yield test cases rebuilt from cached metadata, whose
+        modules are only imported if a test actually runs.
+
+        Returns:
+            Tuple of (test cases, whether the cache entry was refreshed)
+        """
+        stat = test_file.stat()
+        file_path = sys.intern(str(test_file))
+        entry = disk_cache.get(file_path)
+
+        if (
+            entry
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["size"] == stat.st_size
+        ):
+            test_cases = [
+                TestCase(
+                    name=test["name"],
+                    function=_LazyTestFunction(self, test_file, test["name"]),
+                    criteria=test["criteria"],
+                    tags=test["tags"],
+                    timeout=test["timeout"],
+                    retry_count=test["retry_count"],
+                    metadata=test["metadata"],
+                    module=test["module"],
+                    file_path=file_path,
+                )
+                for test in entry["tests"]
+            ]
+            return test_cases, False
+
+        test_cases = self._import_and_discover(test_file)
+        entry = {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "tests": [
+                {
+                    "name": test_case.name,
+                    "criteria": test_case.criteria,
+                    "tags": test_case.tags,
+                    "timeout": test_case.timeout,
+                    "retry_count": test_case.retry_count,
+                    "metadata": test_case.metadata,
+                    "module": test_case.module,
+                }
+                for test_case in test_cases
+            ],
+        }
 
+        try:
+            json.dumps(entry)
+        except (TypeError, ValueError):
+            # Metadata that can't be stored as JSON; always import this file
+            disk_cache.pop(file_path, None)
+        else:
+            disk_cache[file_path] = entry
+
+        return test_cases, True
+
+    def _discovery_cache_path(self) -> Path:
+        """Get the path of the on-disk discovery cache."""
+        return Path(self.config.testing.cache_dir) / DISCOVERY_CACHE_FILE
+
+    def _load_discovery_cache(self) -> Dict[str, Any]:
+        """Load the on-disk discovery cache, or start an empty one."""
+        try:
+            with open(self._discovery_cache_path(), encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if data.get("version") != DISCOVERY_CACHE_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save_discovery_cache(self, disk_cache: Dict[str, Any]) -> None:
+        """Write the on-disk discovery cache atomically."""
+        cache_path = self._discovery_cache_path()
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(".tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": DISCOVERY_CACHE_VERSION, "files": disk_cache}, f)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            self.logger.warning("DISCOVERY", f"Could not save discovery cache: {e}")
+
+    def _load_test_module(
+        self, test_file: Path, cache_key: Tuple[str, int]
+    ) -> List[TestCase]:
+        """Execute a test module and collect the tests it registers."""
         try:
             # Import the module
             module_name = test_file.stem
@@ -171,66 +556,71 @@ class TestRunner:
             module = importlib.util.module_from_spec(spec)
 
             # Clear registry before importing to avoid conflicts
-            from .decorators import clear_test_registry
-
             clear_test_registry()
 
             # Execute the module to register tests
             spec.loader.exec_module(module)
 
-            # Get registered tests
-            registered_tests = get_registered_tests()
-
-            # Convert to TestCase objects with updated file path
-            test_cases = []
-            for test_id, test_case in registered_tests.items():
-                test_case.file_path = str(test_file)
-                test_cases.append(test_case)
+            # Get registered tests with updated file path
+            test_cases = get_registered_test_cases()
+            # One interned string shared by every test case from this file
+            file_path = sys.intern(str(test_file))
+            for test_case in test_cases:
+                test_case.file_path = file_path
 
-            return test_cases
+            self._discovery_cache[cache_key] = test_cases
+            return list(test_cases)
 
         except Exception as e:
             raise TestDiscoveryError(f"Failed to import {test_file}: {e}")
-        finally:
-            # Remove from path
-            if str(test_dir) in sys.path:
-                sys.path.remove(str(test_dir))
 
-    def execute_test(self, test_case: TestCase, verbose: bool = False) -> TestResult:
+    def execute_test(
+        self, test_case: TestCase, verbose: bool = False, buffer_output: bool = False
+    ) -> TestResult:
         """
         Execute a single test case.
 
         Args:
             test_case: Test case to execute
             verbose: Enable verbose output
+            buffer_output: Write verbose output in one block when the test ends
 
         Returns:
             TestResult object
         """
-        start_time = time.time()
+        out = _TestOutput(buffered=buffer_output) if verbose else None
+        try:
+            return self._execute_test(test_case, out)
+        finally:
+            if out is not None:
+                out.flush()
+
+    def _execute_test(
+        self, test_case: TestCase, out: Optional[_TestOutput]
+    ) -> TestResult:
+        """Execute a single test case, writing verbose output to out if given."""
+        # Monotonic, high-resolution clock; immune to wall-clock adjustments
+        start_ns = time.perf_counter_ns()
 
         try:
-            if verbose:
-                print(f"  📝 Executing test function: {test_case.name}")
+            if out:
+                out.write(f"  📝 Executing test function: {test_case.name}")
 
             # Execute the test function
             test_output = test_case.function()
 
-            if verbose:
-                print(f"  📊 Evaluating with criteria: {test_case.criteria}")
+            if out:
+                out.write(f"  📊 Evaluating with criteria: {test_case.criteria}")
 
             # Evaluate the results
             evaluations = self._evaluate_test_output(
-                test_output, test_case.criteria, verbose
+                test_output, test_case.criteria, out=out
             )
 
-            # Determine if test passed
-            passed = self._determine_pass_status(evaluations)
-
-            # Calculate overall score
-            score = self._calculate_overall_score(evaluations)
+            # Determine if test passed and calculate overall score
+            passed, score = self._summarize_evaluations(evaluations)
 
-            duration = time.time() - start_time
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
 
             # Create detailed test result
             result = TestResult(
@@ -248,24 +638,26 @@ class TestRunner:
                 },
             )
 
-            if verbose:
+            if out:
                 status = "✅ PASSED" if passed else "❌ FAILED"
-                print(f"  {status} - Score: {score}, Duration: {duration:.3f}s")
+                out.write(f"  {status} - Score: {score}, Duration: {duration:.3f}s")
                 if not passed:
-                    print(
+                    out.write(
                         f"  💥 Failure reason: {self._get_failure_summary(evaluations)}"
                     )
 
             return result
 
         except Exception as e:
-            duration = time.time() - start_time
+            duration = (time.perf_counter_ns() - start_ns) / 1e9
             error_message = f"Test execution failed: {str(e)}"
+            # Format the traceback once for both the report and verbose output
+            error_traceback = traceback.format_exc()
 
-            if verbose:
-                print(f"  ❌ EXCEPTION: {error_message}")
-                print("  📍 Traceback:")
-                traceback.print_exc()
+            if out:
+                out.write(f"  ❌ EXCEPTION: {error_message}")
+                out.write("  📍 Traceback:")
+                out.write_traceback(error_traceback)
 
             return TestResult(
                 test_name=test_case.name,
@@ -276,7 +668,7 @@ class TestRunner:
                 evaluations={},
                 details={
                     "exception_type": type(e).__name__,
-                    "traceback": traceback.format_exc(),
+                    "traceback": error_traceback,
                     "criteria": test_case.criteria,
                     "tags": test_case.tags,
                     "file_path": test_case.file_path,
@@ -308,17 +700,24 @@ class TestRunner:
         )
 
     def _evaluate_test_output(
-        self, test_output: Any, criteria: List[str], verbose: bool = False
+        self,
+        test_output: Any,
+        criteria: List[str],
+        verbose: bool = False,
+        out: Optional[_TestOutput] = None,
     ) -> Dict[str, Any]:
         """Evaluate test output using specified criteria."""
+        if verbose and out is None:
+            out = _TestOutput()
+
         evaluations = {}
 
         for criterion in criteria:
             try:
-                if verbose:
-                    print(f"    🔍 Running {criterion} evaluator...")
+                if out:
+                    out.write(f"    🔍 Running {criterion} evaluator...")
 
-                evaluator = self.evaluator_registry.get_evaluator(criterion)
+                evaluator, _ = self._resolve_criterion(criterion)
                 if evaluator:
                     evaluation_result = evaluator.evaluate(test_output)
 
@@ -328,78 +727,103 @@ class TestRunner:
                     else:
                         evaluations[criterion] = evaluation_result
 
-                    if verbose:
+                    if out:
                         result_dict = evaluations[criterion]
                         if result_dict.get("passed"):
-                            print(f"    ✅ {criterion}: PASSED")
+                            out.write(f"    ✅ {criterion}: PASSED")
                         else:
-                            print(f"    ❌ {criterion}: FAILED")
+                            out.write(f"    ❌ {criterion}: FAILED")
                             if result_dict.get("error"):
-                                print(f"       Error: {result_dict['error']}")
+                                out.write(f"       Error: {result_dict['error']}")
                             elif "score" in result_dict and "threshold" in result_dict:
-                                print(
+                                out.write(
                                     f"       Score: {result_dict['score']:.3f}, Threshold: {result_dict['threshold']}"
                                 )
                 else:
                     error_msg = f"Evaluator '{criterion}' not found"
                     evaluations[criterion] = {"error": error_msg}
-                    if verbose:
-                        print(f"    ❌ {criterion}: {error_msg}")
+                    if out:
+                        out.write(f"    ❌ {criterion}: {error_msg}")
 
             except Exception as e:
                 error_msg = f"Evaluation failed: {str(e)}"
                 evaluations[criterion] = {"error": error_msg}
-                if verbose:
-                    print(f"    ❌ {criterion}: {error_msg}")
-                    traceback.print_exc()
+                if out:
+                    out.write(f"    ❌ {criterion}: {error_msg}")
+                    out.write_traceback(traceback.format_exc())
 
         return evaluations
 
-    def _determine_pass_status(self, evaluations: Dict[str, Any]) -> bool:
-        """Determine if test passed based on evaluations."""
-        for criterion, result in evaluations.items():
-            if isinstance(result, dict):
-                if result.get("error"):
-                    return False
-                if "passed" in result and not result["passed"]:
-                    return False
-                if "score" in result and result["score"] is not None:
-                    # Use threshold from evaluator config or default 0.8
-                    threshold = result.get("threshold", 0.8)
-                    if threshold is not None and result["score"] < threshold:
-                        return False
-
-        return True
-
-    def _calculate_overall_score(self, evaluations: Dict[str, Any]) -> Optional[float]:
-        """Calculate overall score from evaluations."""
+    def _resolve_criteria(self, test_case: TestCase) -> None:
+        """Resolve a test's criteria on the calling thread before it runs."""
+        for criterion in test_case.criteria:
+            self._resolve_criterion(criterion)
+
+    def _resolve_criterion(
+        self, criterion: str
+    ) -> Tuple[Optional[BaseEvaluator], float]:
+        """Get the evaluator and scoring weight for a criterion."""
+        resolved = self._evaluator_cache.get(criterion)
+        if resolved is None:
+            evaluator_config = self.config.get_evaluator(criterion)
+            weight = evaluator_config.weight if evaluator_config else 1.0
+            resolved = (self.evaluator_registry.get_evaluator(criterion), weight)
+            self._evaluator_cache[criterion] = resolved
+        return resolved
+
+    def _summarize_evaluations(
+        self, evaluations: Dict[str, Any]
+    ) -> Tuple[bool, Optional[float]]:
+        """
+        Determine pass status and overall score in a single pass.
+
+        Returns:
+            Tuple of (passed, weighted average score or None)
+        """
+        passed = True
         scores = []
         weights = []
 
         for criterion, result in evaluations.items():
-            if (
-                isinstance(result, dict)
-                and "score" in result
-                and not result.get("error")
-            ):
-                score = result["score"]
-                if score is not None:  # Only include non-None scores
-                    scores.append(score)
-                    # Get weight from evaluator config
-                    evaluator_config = self.config.get_evaluator(criterion)
-                    weight = evaluator_config.weight if evaluator_config else 1.0
-                    weights.append(weight)
+            if not isinstance(result, dict):
+                continue
+
+            # One lookup per key; missing keys fall back to passing values
+            error = result.get("error")
+            score = result.get("score")
+
+            if error or not result.get("passed", True):
+                passed = False
+            elif passed and score is not None:
+                # Use threshold from evaluator config or default 0.8
+                threshold = result.get("threshold", 0.8)
+                if threshold is not None and score < threshold:
+                    passed = False
+
+            # Only include non-None scores from evaluations that didn't error
+            if score is not None and not error:
+                scores.append(score)
+                # Get weight from evaluator config
+                _, weight = self._resolve_criterion(criterion)
+                weights.append(weight)
 
         if not scores:
-            return None
+            return passed, None
 
-        # Weighted average
-        if weights:
-            weighted_sum = sum(score * weight for score, weight in zip(scores, weights))
-            total_weight = sum(weights)
-            return weighted_sum / total_weight
-        else:
-            return sum(scores) / len(scores)
+        return passed, self._weighted_average(scores, weights)
+
+    @staticmethod
+    def _weighted_average(scores: List[float], weights: List[float]) -> float:
+        """Calculate the weighted average of scores."""
+        if len(scores) >= VECTORIZE_MIN_SCORES:
+            import numpy as np
+
+            weight_array = np.asarray(weights, dtype=float)
+            weighted_sum = np.dot(np.asarray(scores, dtype=float), weight_array)
+            return float(weighted_sum / weight_array.sum())
+
+        weighted_sum = sum(score * weight for score, weight in zip(scores, weights))
+        return weighted_sum / sum(weights)
 
 
 def run_test(
@@ -0,0 +1,36 @@
+"""
+Numba-compiled Levenshtein distance for long strings.
+
+Imported by ``evaluators.base`` only when a pair is too long for the
+bit-parallel path, since importing numba and numpy is slow.
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, nogil=True)
+def _levenshtein_kernel(a, b):  # pragma: no cover - compiled by numba
+    """Two-row Wagner-Fischer DP over code point arrays (len(b) <= len(a))."""
+    n = b.shape[0]
+    row = np.empty(n + 1, dtype=np.int32)
+    for j in range(n + 1):
+        row[j] = j
+
+    for i in range(a.shape[0]):
+        diagonal = row[0]
+        row[0] = i + 1
+        for j in range(n):
+            above = row[j + 1]
+            cost = 0 if a[i] == b[j] else 1
+            row[j + 1] = min(above + 1, row[j] + 1, diagonal + cost)
+            diagonal = above
+
+    return row[n]
+
+
+def levenshtein_distance(s1: str, s2: str) -> int:
+    """Levenshtein distance of two strings, where len(s2) <= len(s1)."""
+    a = np.frombuffer(s1.encode("utf-32-le"), dtype=np.uint32)
+    b = np.frombuffer(s2.encode("utf-32-le"), dtype=np.uint32)
+    return int(_levenshtein_kernel(a, b))
@@ -4,25 +4,144 @@ Base evaluator classes for AgentTest.
 Provides the interface and common functionality for all evaluators.
 """
 
+import importlib.util
+import os
 import re
+import threading
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+# numba and numpy take ~100 ms to import, so the numba kernel is only imported
+# the first time a pair too long for the bit-parallel path is compared
+NUMBA_AVAILABLE = (
+    importlib.util.find_spec("numba") is not None
+    and importlib.util.find_spec("numpy") is not None
+)
+
+# Longest string handled by bit-parallel Levenshtein (one machine word)
+MYERS_MAX_LENGTH = 64
+
+# Minimum number of cases before Levenshtein work is spread over threads
+PARALLEL_MIN_CASES = 8
+
+
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> "re.Pattern":
+    """Compile a regex pattern, caching the result across evaluations."""
+    return re.compile(pattern)
+
+
+@lru_cache(maxsize=4096)
+def _token_set(text: str) -> FrozenSet[str]:
+    """Lowercased word set of a text, cached since expected values repeat."""
+    return frozenset(text.lower().split())
+
+
+def _levenshtein_myers(pattern: str, text: str) -> int:
+    """
+    Levenshtein distance via Myers' bit-parallel algorithm (Hyyrö's variant).
+
+    Each DP column is encoded as bit vectors over ``pattern``, so a whole column
+    is updated with a handful of integer operations. Python integers are
+    arbitrary precision, so this is correct for any pattern length but fastest
+    when ``pattern`` fits in a machine word.
+    """
+    m = len(pattern)
+    if m == 0:
+        return len(text)
+
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp = mask
+    vn = 0
+    distance = m
+
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | vn
+        xh = ((((eq & vp) + vp) & mask) ^ vp) | eq
+        hp = (vn | ~(xh | vp)) & mask
+        hn = vp & xh
+
+        if hp & last:
+            distance += 1
+        elif hn & last:
+            distance -= 1
+
+        hp = ((hp << 1) | 1) & mask
+        hn = (hn << 1) & mask
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+
+    return distance
+
+
+@lru_cache(maxsize=None)
+def _numba_levenshtein() -> Optional[Callable[[str, str], int]]:
+    """Import the numba Levenshtein kernel on first use, or None without numba."""
+    if not NUMBA_AVAILABLE:
+        return None
+    try:
+        from ._levenshtein_numba import levenshtein_distance
+    except ImportError:
+        return None
+    return levenshtein_distance
+
+
+def _levenshtein_distance(s1: str, s2: str) -> int:
+    """Calculate the Levenshtein edit distance between two strings."""
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    if len(s2) == 0:
+        return len(s1)
+
+    # Bit-parallel for word-sized patterns; numba DP for longer ones
+    if len(s2) > MYERS_MAX_LENGTH:
+        numba_distance = _numba_levenshtein()
+        if numba_distance is not None:
+            return numba_distance(s1, s2)
+
+    return _levenshtein_myers(s2, s1)
 
 
-@dataclass
 class EvaluationResult:
     """Result of an evaluation."""
 
-    passed: bool
-    score: Optional[float] = None
-    threshold: Optional[float] = None
-    details: Dict[str, Any] = None
-    error: Optional[str] = None
+    # Slots avoid a per-instance __dict__ (dataclass slots need Python 3.10)
+    __slots__ = ("passed", "score", "threshold", "details", "error")
+
+    def __init__(
+        self,
+        passed: bool,
+        score: Optional[float] = None,
+        threshold: Optional[float] = None,
+        details: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ):
+        self.passed = passed
+        self.score = score
+        self.threshold = threshold
+        self.details = details if details is not None else {}
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"EvaluationResult(passed={self.passed!r}, score={self.score!r}, "
+            f"threshold={self.threshold!r}, details={self.details!r}, "
+            f"error={self.error!r})"
+        )
 
-    def __post_init__(self):
-        if self.details is None:
-            self.details = {}
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EvaluationResult):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -88,6 +207,12 @@ class BaseEvaluator(ABC):
 class StringSimilarityEvaluator(BaseEvaluator):
     """Evaluator for string similarity comparison."""
 
+    def __init__(self, config: Dict[str, Any] = None):
+        super().__init__(config)
+        # Fitting mutates the vectorizer, so each thread gets its own
+        self._local = threading.local()
+        self._similarity_cache = lru_cache(maxsize=4096)(self._compute_similarity)
+
     @property
     def name(self) -> str:
         return "string_similarity"
@@ -109,8 +234,10 @@ class StringSimilarityEvaluator(BaseEvaluator):
                 passed=False, error=f"String similarity evaluation failed: {str(e)}"
             )
 
-    def _evaluate_single_case(self, data: Dict[str, Any]) -> EvaluationResult:
-        """Evaluate a single test case."""
+    def _evaluate_single_case(
+        self, data: Dict[str, Any], similarity: Optional[float] = None
+    ) -> EvaluationResult:
+        """Evaluate a single test case, optionally with a precomputed similarity."""
         actual = data.get("actual")
         expected = data.get("expected")
 
@@ -126,7 +253,11 @@ class StringSimilarityEvaluator(BaseEvaluator):
             )
 
         # Calculate similarity
-        similarity = self._calculate_similarity(str(actual), str(expected))
+        if similarity is None:
+            if actual is expected:
+                similarity = 1.0
+            else:
+                similarity = self._calculate_similarity(str(actual), str(expected))
         threshold = self._get_config_value("threshold", 0.8)
 
         return EvaluationResult(
@@ -147,8 +278,10 @@ class StringSimilarityEvaluator(BaseEvaluator):
         total_score = 0.0
         passed_count = 0
 
+        similarities = self._precompute_similarities(test_cases)
+
         for i, case in enumerate(test_cases):
-            result = self._evaluate_single_case(case)
+            result = self._evaluate_single_case(case, similarities.get(i))
             results.append(result)
 
             if result.score is not None:
@@ -171,10 +304,167 @@ class StringSimilarityEvaluator(BaseEvaluator):
             },
         )
 
+    def _precompute_similarities(self, test_cases: List[Dict]) -> Dict[int, float]:
+        """
+        Compute similarities for all comparable cases in one batch.
+
+        Exact matching is cheap enough to score case by case; for it (or when
+        scikit-learn is unavailable for cosine/Jaccard) an empty mapping is
+        returned and each case is scored individually.
+        """
+        method = self._get_config_value("method", "cosine")
+        if method == "jaccard":
+            batch_similarity = self._batch_jaccard_similarity
+        elif method == "levenshtein":
+            batch_similarity = self._batch_levenshtein_similarity
+        elif method == "exact":
+            return {}
+        else:  # cosine (default)
+            batch_similarity = self._batch_cosine_similarity
+
+        indices = []
+        pairs = []
+        for i, case in enumerate(test_cases):
+            actual = case.get("actual")
+            expected = case.get("expected")
+            if actual is None or expected is None:
+                continue
+
+            # Identical pairs are short-circuited in _calculate_similarity
+            actual, expected = str(actual), str(expected)
+            if actual != expected:
+                indices.append(i)
+                pairs.append((actual, expected))
+
+        if len(pairs) < 2:
+            return {}
+
+        try:
+            similarities = batch_similarity(pairs)
+        except ImportError:
+            return {}
+
+        return dict(zip(indices, similarities))
+
+    def _batch_cosine_similarity(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Calculate cosine similarity for many text pairs at once.
+
+        Tokenizes the whole batch with a single vectorizer fit, then applies
+        TF-IDF weighting per pair so every score is identical to what
+        ``_cosine_similarity`` returns for that pair on its own. Pairs without
+        any word tokens score 0.0 in both.
+        """
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        n = len(pairs)
+        docs = [actual for actual, _ in pairs] + [expected for _, expected in pairs]
+        try:
+            counts = CountVectorizer().fit_transform(docs).astype(np.float64).tocsr()
+        except ValueError:
+            # No text in the batch has a word token
+            return [0.0] * n
+        actual_counts = counts[:n]
+        expected_counts = counts[n:]
+
+        # Smoothed IDF of a two-document corpus: ln(3 / (1 + df)) + 1
+        idf = (actual_counts > 0).astype(np.float64) + (expected_counts > 0)
+        idf.data = np.log(3.0 / (1.0 + idf.data)) + 1.0
+
+        actual_weights = actual_counts.multiply(idf).tocsr()
+        expected_weights = expected_counts.multiply(idf).tocsr()
+
+        dots = np.asarray(actual_weights.multiply(expected_weights).sum(axis=1))
+        norms = np.sqrt(
+            np.asarray(actual_weights.multiply(actual_weights).sum(axis=1))
+            * np.asarray(expected_weights.multiply(expected_weights).sum(axis=1))
+        )
+
+        similarities = np.zeros(n)
+        nonzero = norms.ravel() > 0
+        similarities[nonzero] = dots.ravel()[nonzero] / norms.ravel()[nonzero]
+
+        return [float(similarity) for similarity in similarities]
+
+    def _batch_jaccard_similarity(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """
+        Calculate Jaccard similarity for many text pairs at once.
+
+        Builds one binary word-indicator matrix for the batch, using the same
+        lowercased whitespace tokens as ``_jaccard_similarity``.
+        """
+        import numpy as np
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        n = len(pairs)
+        docs = [actual for actual, _ in pairs] + [expected for _, expected in pairs]
+        vectorizer = CountVectorizer(binary=True, lowercase=True, token_pattern=r"\S+")
+        try:
+            indicators = vectorizer.fit_transform(docs).tocsr()
+        except ValueError:
+            # Every text is empty, so every union is empty
+            return [0.0] * n
+
+        actual_words = indicators[:n]
+        expected_words = indicators[n:]
+
+        intersections = np.asarray(
+            actual_words.multiply(expected_words).sum(axis=1)
+        ).ravel()
+        unions = (
+            np.asarray(actual_words.sum(axis=1)).ravel()
+            + np.asarray(expected_words.sum(axis=1)).ravel()
+            - intersections
+        )
+
+        similarities = np.zeros(n)
+        nonzero = unions > 0
+        similarities[nonzero] = intersections[nonzero] / unions[nonzero]
+
+        return [float(similarity) for similarity in similarities]
+
+    def _batch_levenshtein_similarity(
+        self, pairs: List[Tuple[str, str]]
+    ) -> List[float]:
+        """
+        Calculate Levenshtein similarity for many text pairs.
+
+        Pairs too long for the bit-parallel path go through the numba kernel,
+        which releases the GIL, so larger batches are spread over threads.
+        """
+        has_long_pairs = any(
+            min(len(actual), len(expected)) > MYERS_MAX_LENGTH
+            for actual, expected in pairs
+        )
+        if not (NUMBA_AVAILABLE and has_long_pairs) or len(pairs) < PARALLEL_MIN_CASES:
+            return [
+                self._levenshtein_similarity(actual, expected)
+                for actual, expected in pairs
+            ]
+
+        max_workers = min(len(pairs), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(lambda pair: self._levenshtein_similarity(*pair), pairs)
+            )
+
     def _calculate_similarity(self, actual: str, expected: str) -> float:
-        """Calculate similarity between two strings."""
+        """Calculate similarity between two strings, memoizing repeated pairs."""
+        # Identical strings are a perfect match under every method
+        if actual == expected:
+            return 1.0
+
         method = self._get_config_value("method", "cosine")
 
+        # All supported methods are symmetric, so order the pair to share entries
+        if expected < actual:
+            actual, expected = expected, actual
+
+        return self._similarity_cache(method, actual, expected)
+
+    def _compute_similarity(self, method: str, actual: str, expected: str) -> float:
+        """Calculate similarity between two strings with the given method."""
         if method == "exact":
             return 1.0 if actual == expected else 0.0
         elif method == "levenshtein":
@@ -187,12 +477,16 @@ class StringSimilarityEvaluator(BaseEvaluator):
     def _cosine_similarity(self, text1: str, text2: str) -> float:
         """Calculate cosine similarity between two texts."""
         try:
-            from sklearn.feature_extraction.text import TfidfVectorizer
-            from sklearn.metrics.pairwise import cosine_similarity
+            from sklearn.metrics.pairwise import linear_kernel
 
-            vectorizer = TfidfVectorizer()
-            tfidf_matrix = vectorizer.fit_transform([text1, text2])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
+            # TfidfVectorizer rows are L2-normalized (norm="l2" by default), so
+            # the plain dot product already is the cosine similarity
+            try:
+                tfidf_matrix = self._get_vectorizer().fit_transform([text1, text2])
+            except ValueError:
+                # Empty vocabulary: neither text has a word token to compare
+                return 0.0
+            similarity = linear_kernel(tfidf_matrix[0:1], tfidf_matrix[1:2])[0, 0]
 
             return float(similarity)
 
@@ -200,56 +494,53 @@ class StringSimilarityEvaluator(BaseEvaluator):
             # Fallback to simple word overlap
             return self._word_overlap_similarity(text1, text2)
 
-    def _levenshtein_similarity(self, text1: str, text2: str) -> float:
-        """Calculate Levenshtein similarity."""
-
-        def levenshtein_distance(s1, s2):
-            if len(s1) < len(s2):
-                return levenshtein_distance(s2, s1)
-
-            if len(s2) == 0:
-                return len(s1)
-
-            previous_row = range(len(s2) + 1)
-            for i, c1 in enumerate(s1):
-                current_row = [i + 1]
-                for j, c2 in enumerate(s2):
-                    insertions = previous_row[j + 1] + 1
-                    deletions = current_row[j] + 1
-                    substitutions = previous_row[j] + (c1 != c2)
-                    current_row.append(min(insertions, deletions, substitutions))
-                previous_row = current_row
+    def _get_vectorizer(self):
+        """Get this thread's TF-IDF vectorizer, creating it on first use."""
+        vectorizer = getattr(self._local, "vectorizer", None)
+        if vectorizer is None:
+            from sklearn.feature_extraction.text import TfidfVectorizer
 
-            return previous_row[-1]
+            vectorizer = self._local.vectorizer = TfidfVectorizer()
+        return vectorizer
 
+    def _levenshtein_similarity(self, text1: str, text2: str) -> float:
+        """Calculate Levenshtein similarity."""
         max_len = max(len(text1), len(text2))
         if max_len == 0:
             return 1.0
 
-        distance = levenshtein_distance(text1, text2)
+        distance = _levenshtein_distance(text1, text2)
         return 1.0 - (distance / max_len)
 
     def _jaccard_similarity(self, text1: str, text2: str) -> float:
         """Calculate Jaccard similarity."""
-        set1 = set(text1.lower().split())
-        set2 = set(text2.lower().split())
+        return self._jaccard_from_sets(_token_set(text1), _token_set(text2))
 
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
+    def _jaccard_from_sets(self, set1: FrozenSet[str], set2: FrozenSet[str]) -> float:
+        """Calculate Jaccard similarity between two precomputed word sets."""
+        intersection = len(set1 & set2)
+        union = len(set1) + len(set2) - intersection
 
         return intersection / union if union > 0 else 0.0
 
     def _word_overlap_similarity(self, text1: str, text2: str) -> float:
         """Simple word overlap similarity as fallback."""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        return self._word_overlap_from_sets(_token_set(text1), _token_set(text2))
 
+    def _word_overlap_from_sets(
+        self, words1: FrozenSet[str], words2: FrozenSet[str]
+    ) -> float:
+        """Word overlap similarity between two precomputed word sets."""
         if not words1 and not words2:
             return 1.0
         if not words1 or not words2:
             return 0.0
 
-        intersection = len(words1.intersection(words2))
+        # Stops at the first shared word without building an intersection set
+        if words1.isdisjoint(words2):
+            return 0.0
+
+        intersection = len(words1 & words2)
         return intersection / max(len(words1), len(words2))
 
 
@@ -340,7 +631,7 @@ class RegexEvaluator(BaseEvaluator):
 
         for pattern in patterns:
             try:
-                match = re.search(pattern, actual)
+                match = _compile_pattern(pattern).search(actual)
                 if match:
                     matches_found += 1
                     pattern_results.append(
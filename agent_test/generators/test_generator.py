@@ -5,15 +5,764 @@ Automatically generates test cases using LLMs by analyzing agent code and docstr
 """
 
 import ast
+import copy
+import hashlib
+import importlib
+import json
 import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import yaml
+
+try:
+    import orjson
 
-from jinja2 import Template
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    # libyaml's emitter, when PyYAML was built with it
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
 
 from ..core.config import Config
 from ..utils.exceptions import GenerationError
 
+# Substrings that suggest a file contains agent code, matched case-insensitively
+AGENT_INDICATORS = (
+    "agent",
+    "chain",
+    "llm",
+    "openai",
+    "anthropic",
+    "langchain",
+    "llama_index",
+)
+# Indicators containing another one (e.g. "langchain" and "chain") can never
+# change the result, so they're dropped from the set that is actually scanned
+_AGENT_INDICATOR_BYTES = tuple(
+    indicator.encode("ascii")
+    for indicator in AGENT_INDICATORS
+    if not any(other != indicator and other in indicator for other in AGENT_INDICATORS)
+)
+# Bytes carried between chunks, so an indicator split across two still matches
+_AGENT_INDICATOR_OVERLAP = max(map(len, _AGENT_INDICATOR_BYTES)) - 1
+
+# Agent files are scanned in chunks, so most stop after the first read. Agent
+# code shows itself in imports and names near the top, so scanning stops after
+# the first AGENT_SCAN_MAX_BYTES of large files such as generated data modules.
+AGENT_SCAN_CHUNK_SIZE = 64 * 1024
+AGENT_SCAN_MAX_BYTES = 256 * 1024
+
+# Upper bound on concurrent LLM requests, to stay within provider rate limits
+LLM_MAX_CONCURRENCY = 10
+
+# Agents per batched prompt; larger batches are split into several requests
+BATCH_MAX_AGENTS = 8
+
+# Shared by the single-agent and batched generation prompts, via the system prompt
+TEST_CASE_JSON_FORMAT = (
+    "[",
+    "  {",
+    '    "name": "test_function_name_descriptive",',
+    '    "description": "Clear description of what this test validates",',
+    '    "function_to_test": "actual_function_name_from_code",',
+    '    "input_data": {"key": "value"},',
+    '    "expected_behavior": "What should happen",',
+    '    "evaluation_criteria": {',
+    '      "accuracy": "Response should be accurate and relevant",',
+    '      "format": "Output should be in correct format",',
+    '      "error_handling": "Should handle errors gracefully"',
+    "    },",
+    '    "tags": ["category", "priority"]',
+    "  }",
+    "]",
+)
+TEST_CASE_REQUIREMENTS = (
+    "REQUIREMENTS:",
+    "1. Use ACTUAL function names from the agent's code",
+    "2. Create realistic input data based on function signatures",
+    "3. Include specific evaluation criteria (3-5 criteria per test)",
+    "4. Cover these scenarios:",
+    "   - Normal operation with typical inputs",
+    "   - Edge cases (empty, null, boundary values)",
+    "   - Error conditions (invalid inputs, exceptions)",
+    "   - Performance considerations (large inputs)",
+    "   - Integration scenarios (if applicable)",
+    "",
+    "5. Make test names descriptive and follow Python naming conventions",
+    "6. Ensure evaluation criteria are specific and measurable",
+    "7. Use appropriate tags: ['basic', 'edge_case', 'error_handling', 'performance', 'integration']",
+)
+
+# Everything that doesn't depend on the agent goes in the system prompt, so it
+# forms an identical prefix across requests that providers can cache
+GENERATION_SYSTEM_PROMPT = "\n".join(
+    [
+        "You are an expert test case generator for AI agents and Python code. Generate test cases in valid JSON format exactly as requested."
+        " Focus on creating realistic, comprehensive test cases.",
+        "",
+        "Test cases must use the following EXACT JSON format:",
+        *TEST_CASE_JSON_FORMAT,
+        "",
+        *TEST_CASE_REQUIREMENTS,
+    ]
+)
+
+# Anthropic only caches prompt prefixes marked with cache_control
+ANTHROPIC_SYSTEM_BLOCKS = [
+    {
+        "type": "text",
+        "text": GENERATION_SYSTEM_PROMPT,
+        "cache_control": {"type": "ephemeral"},
+    }
+]
+
+# Used when the project has no .agenttest/templates/test_template.py.j2.
+# _render_default_python renders the same output directly; keep them in sync.
+DEFAULT_PYTHON_TEMPLATE = '''"""
+Generated test for {{ agent_name }}.
+
+This test was automatically generated by AgentTest.
+"""
+
+from agent_test import agent_test
+{% if agent_module_path %}
+from {{ agent_module_path }} import *
+{% else %}
+# TODO: Import your agent functions here
+# from your_module import your_function
+{% endif %}
+
+
+{% for test_case in test_cases %}
+@agent_test(
+    criteria=[{% for criterion in test_case.evaluation_criteria.keys() %}"{{ criterion }}"{% if not loop.last %}, {% endif %}{% endfor %}],
+    tags={{ test_case.tags | tojson }}
+)
+def {{ test_case.name }}():
+    """{{ test_case.description }}"""
+    {% if test_case.input_data -%}
+    input_data = {{ test_case.input_data | tojson }}
+    {%- else -%}
+    input_data = {}
+    {%- endif %}
+    {% if test_case.expected_behavior -%}
+    expected_behavior = {{ test_case.expected_behavior | tojson }}
+    {%- endif %}
+
+    {% if test_case.function_to_test -%}
+    # Call the function being tested
+    {% if "." in test_case.function_to_test -%}
+    # Class method call
+    {% set class_method = test_case.function_to_test.split(".") -%}
+    {% if test_case.input_data.get("_class_instance") -%}
+    instance = {{ class_method[0] }}(**{{ test_case.input_data._class_instance.constructor_args | tojson }})
+    actual = instance.{{ class_method[1] }}({% for key, value in test_case.input_data.items() if key != "_class_instance" %}{{ key }}={{ value | tojson }}{% if not loop.last %}, {% endif %}{% endfor %})
+    {%- else -%}
+    # TODO: Create instance of {{ class_method[0] }} with appropriate arguments
+    # instance = {{ class_method[0] }}(api_key="your_api_key")
+    # actual = instance.{{ class_method[1] }}(**input_data)
+    actual = None
+    {%- endif %}
+    {%- else -%}
+    # Function call
+    {% if test_case.input_data -%}
+    actual = {{ test_case.function_to_test }}(**input_data)
+    {%- else -%}
+    actual = {{ test_case.function_to_test }}()
+    {%- endif %}
+    {%- endif %}
+    {%- else -%}
+    # TODO: Call your agent function here
+    # actual = your_agent_function(input_data)
+    actual = None  # Replace with actual function call
+    {%- endif %}
+
+    return {
+        "input": input_data,
+        {% if test_case.expected_behavior -%}
+        "expected_behavior": expected_behavior,
+        {%- endif %}
+        "actual": actual,
+        "evaluation_criteria": {{ test_case.evaluation_criteria | tojson }}
+    }
+
+{% endfor %}
+'''
+
+# Source excerpt included in generation prompts; long lines are clipped to
+# keep the prompt's token count bounded
+PROMPT_SOURCE_LINES = 50
+PROMPT_MAX_LINE_LENGTH = 200
+
+# Agents at or below these sizes are routed to LLMConfig.fast_model, if set.
+# Complexity counts each function once and each class three times.
+FAST_MODEL_MAX_COMPLEXITY = 3
+FAST_MODEL_MAX_PROMPT_CHARS = 3000
+
+# Directories that never hold agent source, skipped when discovering agents.
+# Hidden directories (.git, .venv, .tox, caches, ...) are always skipped too.
+SKIPPED_DIRS = frozenset({"__pycache__", "build", "dist", "node_modules", "venv"})
+
+# On-disk agent analyses live in this subdirectory of testing.cache_dir. Bump
+# the version whenever the shape of the analysis changes.
+ANALYSIS_CACHE_DIR = "analysis"
+ANALYSIS_CACHE_VERSION = 3
+
+
+@lru_cache(maxsize=None)
+def _import_provider(module_name: str, display_name: str, package: str) -> Any:
+    """Import an optional LLM provider SDK, only once the provider is selected."""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        raise GenerationError(
+            f"{display_name} package not installed. "
+            f"Install with: pip install {package}"
+        )
+
+
+@lru_cache(maxsize=None)
+def _template_environment() -> Any:
+    """Get the shared Jinja environment, importing Jinja on first use."""
+    # Only custom project templates need Jinja; the default one is rendered
+    # directly, so most runs never import it
+    from jinja2 import Environment
+
+    return Environment(auto_reload=False, cache_size=400)
+
+
+@lru_cache(maxsize=32)
+def _compile_template(source: str) -> Any:
+    """Compile a Jinja template, memoized on its source text."""
+    return _template_environment().from_string(source)
+
+
+# Fields every validated test case has
+_TEST_CASE_FIELDS = (
+    "name",
+    "description",
+    "function_to_test",
+    "input_data",
+    "expected_behavior",
+    "evaluation_criteria",
+    "tags",
+)
+
+
+def _tojson(value: Any) -> str:
+    """Serialize a value exactly like Jinja's tojson filter."""
+    return (
+        json.dumps(value, sort_keys=True)
+        .replace("<", "\\u003c")
+        .replace(">", "\\u003e")
+        .replace("&", "\\u0026")
+        .replace("'", "\\u0027")
+    )
+
+
+def _render_default_python_test(test_case: Dict[str, Any]) -> Optional[str]:
+    """Render one test case like DEFAULT_PYTHON_TEMPLATE, or None if unsupported."""
+    # Missing fields, and shapes the template would fail on, are left to
+    # Jinja and its undefined semantics
+    if not all(field in test_case for field in _TEST_CASE_FIELDS):
+        return None
+
+    input_data = test_case["input_data"]
+    criteria = test_case["evaluation_criteria"]
+    function_to_test = test_case["function_to_test"]
+    expected_behavior = test_case["expected_behavior"]
+    description = test_case["description"]
+
+    if not isinstance(input_data, dict) or not isinstance(criteria, dict):
+        return None
+    if not isinstance(function_to_test, str):
+        return None
+
+    criteria_list = ", ".join(f'"{criterion}"' for criterion in criteria)
+    parts = [
+        "\n@agent_test(\n",
+        f"    criteria=[{criteria_list}],\n",
+        f"    tags={_tojson(test_case['tags'])}\n",
+        ")\n",
+        f"def {test_case['name']}():\n",
+        f'    """{description}"""\n',
+        f"    input_data = {_tojson(input_data) if input_data else '{}'}\n    ",
+    ]
+    if expected_behavior:
+        parts.append(f"expected_behavior = {_tojson(expected_behavior)}")
+    parts.append("\n\n    ")
+
+    if not function_to_test:
+        parts.append(
+            "# TODO: Call your agent function here\n"
+            "    # actual = your_agent_function(input_data)\n"
+            "    actual = None  # Replace with actual function call"
+        )
+    elif "." in function_to_test:
+        class_method = function_to_test.split(".")
+        parts.append("# Call the function being tested\n    # Class method call\n    ")
+        class_instance = input_data.get("_class_instance")
+        if class_instance:
+            if not isinstance(class_instance, dict):
+                return None
+            if "constructor_args" not in class_instance:
+                return None
+            call_args = ", ".join(
+                f"{key}={_tojson(value)}"
+                for key, value in input_data.items()
+                if key != "_class_instance"
+            )
+            parts.append(
+                f"instance = {class_method[0]}"
+                f"(**{_tojson(class_instance['constructor_args'])})\n"
+                f"    actual = instance.{class_method[1]}({call_args})"
+            )
+        else:
+            parts.append(
+                f"# TODO: Create instance of {class_method[0]} with appropriate"
+                " arguments\n"
+                f'    # instance = {class_method[0]}(api_key="your_api_key")\n'
+                f"    # actual = instance.{class_method[1]}(**input_data)\n"
+                "    actual = None"
+            )
+    else:
+        call = "(**input_data)" if input_data else "()"
+        parts.append(
+            "# Call the function being tested\n    # Function call\n    "
+            f"actual = {function_to_test}{call}"
+        )
+
+    parts.append('\n\n    return {\n        "input": input_data,\n        ')
+    if expected_behavior:
+        parts.append('"expected_behavior": expected_behavior,')
+    parts.append(
+        '\n        "actual": actual,\n'
+        f'        "evaluation_criteria": {_tojson(criteria)}\n'
+        "    }\n\n"
+    )
+    return "".join(parts)
+
+
+def _render_default_python(
+    agent_name: str,
+    agent_module_path: Optional[str],
+    test_cases: List[Dict[str, Any]],
+) -> Optional[str]:
+    """
+    Render DEFAULT_PYTHON_TEMPLATE without Jinja.
+
+    Produces exactly what the template renders to, or None when a test case
+    has a shape only Jinja handles, so the caller can fall back to it.
+    """
+    if agent_module_path:
+        module_import = f"from {agent_module_path} import *"
+    else:
+        module_import = (
+            "# TODO: Import your agent functions here\n"
+            "# from your_module import your_function"
+        )
+
+    parts = [
+        f'"""\nGenerated test for {agent_name}.\n\n'
+        'This test was automatically generated by AgentTest.\n"""\n\n'
+        f"from agent_test import agent_test\n\n{module_import}\n\n\n\n"
+    ]
+    for test_case in test_cases:
+        rendered = _render_default_python_test(test_case)
+        if rendered is None:
+            return None
+        parts.append(rendered)
+
+    return "".join(parts)
+
+
+def _json_loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(value: Any) -> bytes:
+    """Serialize JSON to UTF-8 bytes, using orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+# Characters that matter when scanning for balanced JSON; everything else is skipped
+_JSON_STRUCTURE_PATTERN = re.compile(r'[\[\]{}"\\]')
+_JSON_CLOSERS = {"[": "]", "{": "}"}
+
+
+def _extract_first_json(text: str, open_char: str = "[") -> Optional[str]:
+    """
+    Extract the first balanced JSON array (or object) embedded in text.
+
+    Brackets inside string literals are ignored. Returns None if there is no
+    complete array (or object).
+    """
+    start = text.find(open_char)
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    skip_to = start
+
+    for match in _JSON_STRUCTURE_PATTERN.finditer(text, start):
+        pos = match.start()
+        if pos < skip_to:
+            # Escaped character inside a string
+            continue
+
+        char = text[pos]
+        if in_string:
+            if char == "\\":
+                skip_to = pos + 2
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "[{":
+            depth += 1
+        elif char in "]}":
+            depth -= 1
+            if not depth:
+                return text[start : pos + 1]
+
+    return None
+
+
+def _load_first_json(text: str, open_char: str = "[") -> Any:
+    """
+    Decode the first JSON array (or object) embedded in text.
+
+    Returns None if there is none; raises ValueError if it isn't valid JSON.
+    """
+    # Well-behaved models reply with bare JSON, which decodes without a scan
+    stripped = text.strip()
+    if stripped[:1] == open_char and stripped[-1:] == _JSON_CLOSERS[open_char]:
+        try:
+            return _json_loads(stripped)
+        except ValueError:
+            pass
+
+    json_str = _extract_first_json(text, open_char)
+    return None if json_str is None else _json_loads(json_str)
+
+
+def _iter_json_array_items(chunks: Iterable[str]) -> Iterator[Any]:
+    """
+    Incrementally decode the objects of the first JSON array in a text stream.
+
+    Each object is yielded as soon as its closing brace arrives; objects that
+    aren't valid JSON are skipped. Arrays without any objects, such as a "[1]"
+    in prose before the real answer, are passed over.
+    """
+    in_array = False
+    depth = 0
+    in_string = False
+    escaped = False
+    yielded = False
+    current: List[str] = []
+
+    for chunk in chunks:
+        for char in chunk:
+            if not in_array:
+                in_array = char == "["
+                continue
+
+            if depth:
+                current.append(char)
+
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == '"':
+                in_string = True
+            elif char in "{[":
+                if not depth:
+                    current = [char]
+                depth += 1
+            elif char in "}]":
+                if not depth:
+                    # End of the top-level array
+                    if yielded:
+                        return
+                    in_array = False
+                    continue
+                depth -= 1
+                if not depth:
+                    try:
+                        item = _json_loads("".join(current))
+                    except ValueError:
+                        continue
+                    yielded = True
+                    yield item
+
+
+def _head_lines(text: str, count: int) -> List[str]:
+    """Return the first ``count`` lines of ``text``, each clipped in length."""
+    # maxsplit stops splitting after the lines we need; the remainder of the
+    # file ends up in a final element that is dropped
+    lines = text.split("\n", count)[:count]
+    return [line[:PROMPT_MAX_LINE_LENGTH] for line in lines]
+
+
+def _describe_function(func: Dict[str, Any], prefix: str) -> str:
+    """Describe a function or method as one prompt line."""
+    return f"{prefix}{func['name']}({', '.join(func['args'])}): {func['docstring']}"
+
+
+def _iter_python_files(root: str) -> Iterator[Path]:
+    """Yield the .py files under root, pruning skipped dirs as they're found."""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not (
+                            entry.name in SKIPPED_DIRS or entry.name.startswith(".")
+                        ):
+                            stack.append(entry.path)
+                    elif entry.name.endswith(".py"):
+                        yield Path(entry.path)
+        except OSError:
+            # Unreadable directories are skipped, as rglob does
+            continue
+
+
+def _contains_agent_indicator(file_path: Path) -> bool:
+    """Check the start of a file for agent indicators, stopping at the first hit."""
+    # Indicators are ASCII, so raw bytes can be lowered and searched without
+    # decoding. Substring checks beat a re.IGNORECASE alternation several-fold.
+    tail = b""
+    remaining = AGENT_SCAN_MAX_BYTES
+
+    with open(file_path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(AGENT_SCAN_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+
+            window = tail + chunk.lower()
+            if any(indicator in window for indicator in _AGENT_INDICATOR_BYTES):
+                return True
+            tail = window[-_AGENT_INDICATOR_OVERLAP:]
+
+    return False
+
+
+def _ripgrep_agent_files(search_dirs: List[str]) -> Optional[List[Path]]:
+    """
+    Find agent files with ripgrep, which walks and searches in parallel.
+
+    Matches the Python scan's rules for skipped and hidden dirs, test files
+    and indicators, and returns paths in the same sorted order. Two
+    differences remain: ripgrep searches whole files rather than the first
+    AGENT_SCAN_MAX_BYTES, so it can also find indicators further into large
+    files, and it doesn't search symlinked files.
+
+    Returns None when ripgrep is unavailable or fails, so the caller can fall
+    back to the Python scan.
+    """
+    rg = shutil.which("rg")
+    if rg is None:
+        return None
+
+    roots = [search_dir for search_dir in search_dirs if os.path.isdir(search_dir)]
+    if not roots:
+        return []
+
+    # Like the Python scan, hidden files are searched but hidden dirs aren't,
+    # and .gitignore is not consulted
+    command = [
+        rg,
+        "--files-with-matches",
+        "--fixed-strings",
+        "--ignore-case",
+        "--hidden",
+        "--no-ignore",
+        "--no-messages",
+        "--glob",
+        "*.py",
+        "--glob",
+        "!.*/",
+        "--glob",
+        "!test_*.py",
+        "--glob",
+        "!__init__.py",
+    ]
+    for skipped_dir in sorted(SKIPPED_DIRS):
+        command += ["--glob", f"!{skipped_dir}/"]
+    for indicator in _AGENT_INDICATOR_BYTES:
+        command += ["--regexp", indicator.decode("ascii")]
+    command += ["--", *roots]
+
+    try:
+        result = subprocess.run(command, capture_output=True, check=False)
+    except OSError:
+        return None
+
+    # Exit status 1 means no matches; 2 means some files couldn't be searched
+    if result.returncode not in (0, 1):
+        return None
+
+    # Overlapping search dirs ("agents" and ".") report a file twice
+    paths = {Path(os.fsdecode(line)) for line in result.stdout.splitlines() if line}
+    return sorted(paths)
+
+
+def _annotation_source(annotation: Optional[ast.expr]) -> Optional[str]:
+    """Render a type annotation as source text, e.g. "List[str]"."""
+    if annotation is None:
+        return None
+    if hasattr(ast, "unparse"):  # Python 3.9+
+        return ast.unparse(annotation)
+    # Older Pythons can only name plain annotations like "str"
+    return getattr(annotation, "id", None)
+
+
+def _source_key(file_path: Path) -> Tuple[str, int, int]:
+    """Cache key for a source file that changes whenever the file does."""
+    stat = file_path.stat()
+    return str(file_path), stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=512)
+def _read_source(path: str, mtime_ns: int, size: int) -> str:
+    """Read a source file, memoized on its path, mtime and size."""
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+@lru_cache(maxsize=512)
+def _parse_source(path: str, mtime_ns: int, size: int) -> ast.Module:
+    """Parse a source file, memoized on its path, mtime and size."""
+    return ast.parse(_read_source(path, mtime_ns, size))
+
+
+# Nodes whose bodies can hold statements; expressions never can
+_STATEMENT_NODES: Tuple[type, ...] = (ast.stmt, ast.excepthandler)
+if hasattr(ast, "match_case"):  # Python 3.10+
+    _STATEMENT_NODES += (ast.match_case,)
+
+
+def _walk_statements(tree: ast.AST) -> Iterator[ast.AST]:
+    """Like ast.walk, in the same order, but never descends into expressions."""
+    todo = deque([tree])
+    while todo:
+        node = todo.popleft()
+        todo.extend(
+            child
+            for child in ast.iter_child_nodes(node)
+            if isinstance(child, _STATEMENT_NODES)
+        )
+        yield node
+
+
+class _RequestThrottle:
+    """Space out LLM requests to stay under a requests-per-minute limit."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None):
+        self._interval = 60.0 / requests_per_minute if requests_per_minute else 0.0
+        self._lock = threading.Lock()
+        self._next_request = 0.0
+
+    def wait(self) -> None:
+        """Block until the next request is allowed to start."""
+        if not self._interval:
+            return
+
+        # Reserve a slot under the lock, but sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + self._interval
+
+        if start > now:
+            time.sleep(start - now)
+
+
+class _AgentStructureVisitor(ast.NodeVisitor):
+    """
+    Collect top-level functions, classes and all imports of a module.
+
+    Only statements are visited, since expressions can't hold definitions or
+    imports, and functions and classes nested in other definitions are skipped.
+    """
+
+    def __init__(self):
+        self.functions: List[ast.FunctionDef] = []
+        self.classes: List[ast.ClassDef] = []
+        self.imports: List[str] = []
+        self._depth = 0
+
+    def generic_visit(self, node: ast.AST) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, _STATEMENT_NODES):
+                self.visit(child)
+
+    def _visit_definition(
+        self, node: ast.AST, found: Optional[List[ast.AST]] = None
+    ) -> None:
+        if found is not None and self._depth == 0:
+            found.append(node)
+
+        # Keep descending, but only to pick up imports in the body
+        self._depth += 1
+        self.generic_visit(node)
+        self._depth -= 1
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> None:
+        self._visit_definition(node, self.functions)
+
+    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> None:
+        # Generated tests call functions synchronously, so only collect imports
+        self._visit_definition(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._visit_definition(node, self.classes)
+
+    def visit_Import(self, node: ast.Import) -> None:
+        for alias in node.names:
+            self.imports.append(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        module = node.module or ""
+        for alias in node.names:
+            self.imports.append(f"{module}.{alias.name}")
+
 
 class TestGenerator:
     """Generates test cases automatically using LLM analysis."""
@@ -21,7 +770,12 @@ class TestGenerator:
     def __init__(self, config: Config):
         self.config = config
         self.llm_client = None
+        # Per-file analysis, reused until the file changes, and package
+        # structure per project root, which every agent in a project shares
+        self._analysis_cache: Dict[str, Tuple[Tuple[str, int, int], Dict]] = {}
+        self._package_structure_cache: Dict[str, Dict[str, Any]] = {}
         self._setup_llm_client()
+        self._throttle = _RequestThrottle(self.config.llm.requests_per_minute)
 
     def _setup_llm_client(self):
         """Setup LLM client for test generation."""
@@ -41,91 +795,74 @@ class TestGenerator:
 
     def _setup_openai_client(self):
         """Setup OpenAI client."""
-        try:
-            import openai
-
-            api_key = self.config.llm.api_key
-            if not api_key:
-                import os
-
-                api_key = os.getenv("OPENAI_API_KEY")
+        openai = _import_provider("openai", "OpenAI", "openai")
 
-            if not api_key:
-                raise GenerationError("OpenAI API key not found")
+        api_key = self.config.llm.api_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise GenerationError("OpenAI API key not found")
 
-            self.llm_client = openai.OpenAI(api_key=api_key)
-            self.model = self.config.llm.model
-
-        except ImportError:
-            raise GenerationError(
-                "OpenAI package not installed. Install with: pip install openai"
-            )
+        self.llm_client = openai.OpenAI(api_key=api_key)
+        self.model = self.config.llm.model
 
     def _setup_anthropic_client(self):
         """Setup Anthropic client."""
-        try:
-            import anthropic
+        anthropic = _import_provider("anthropic", "Anthropic", "anthropic")
 
-            api_key = self.config.llm.api_key
-            if not api_key:
-                import os
+        api_key = self.config.llm.api_key or os.getenv("ANTHROPIC_API_KEY")
+        if not api_key:
+            raise GenerationError("Anthropic API key not found")
 
-                api_key = os.getenv("ANTHROPIC_API_KEY")
-
-            if not api_key:
-                raise GenerationError("Anthropic API key not found")
-
-            self.llm_client = anthropic.Anthropic(api_key=api_key)
-            self.model = self.config.llm.model
-
-        except ImportError:
-            raise GenerationError(
-                "Anthropic package not installed. Install with: pip install anthropic"
-            )
+        self.llm_client = anthropic.Anthropic(api_key=api_key)
+        self.model = self.config.llm.model
 
     def _setup_gemini_client(self):
         """Setup Google Gemini client."""
-        try:
-            import google.generativeai as genai
-
-            api_key = self.config.llm.api_key
-            if not api_key:
-                import os
-
-                api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-
-            if not api_key:
-                print("Warning: No LLM API key found. Using fallback test generation.")
-                self.llm_client = None
-                return
+        genai = _import_provider(
+            "google.generativeai", "Google Generative AI", "google-generativeai"
+        )
 
-            genai.configure(api_key=api_key)
-            self.llm_client = genai.GenerativeModel(
-                self.config.llm.model or "gemini-pro"
-            )
-            self.model = self.config.llm.model or "gemini-pro"
+        api_key = (
+            self.config.llm.api_key
+            or os.getenv("GOOGLE_API_KEY")
+            or os.getenv("GEMINI_API_KEY")
+        )
+        if not api_key:
+            print("Warning: No LLM API key found. Using fallback test generation.")
+            self.llm_client = None
+            return
 
-        except ImportError:
-            raise GenerationError(
-                "Google Generative AI package not installed. Install with: pip install google-generativeai"
-            )
+        genai.configure(api_key=api_key)
+        self.llm_client = genai.GenerativeModel(self.config.llm.model or "gemini-pro")
+        self.model = self.config.llm.model or "gemini-pro"
 
     def discover_agents(self, search_dirs: Optional[List[str]] = None) -> List[str]:
-        """Discover agent files in the project."""
+        """Discover agent files in the project, as sorted paths."""
         if search_dirs is None:
             search_dirs = ["agents", "src", "."]
 
-        agent_files = []
+        agent_files = _ripgrep_agent_files(search_dirs)
+        if agent_files is not None:
+            return [str(file_path) for file_path in agent_files]
 
-        for search_dir in search_dirs:
-            search_path = Path(search_dir)
-            if search_path.exists():
+        # Checking a file is mostly blocking reads, so overlap them on threads.
+        # Files are submitted as the walk finds them, overlapping it with checks.
+        checks = {}
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for search_dir in search_dirs:
                 # Look for Python files that might contain agents
-                for file_path in search_path.rglob("*.py"):
-                    if self._is_agent_file(file_path):
-                        agent_files.append(str(file_path))
+                for file_path in _iter_python_files(search_dir):
+                    # Overlapping search dirs ("agents" and ".") find files twice
+                    if file_path not in checks:
+                        checks[file_path] = executor.submit(
+                            self._is_agent_file, file_path
+                        )
 
-        return agent_files
+        # Sorted, as ripgrep's results are, so the order doesn't depend on the scan
+        agent_files = sorted(
+            file_path for file_path, check in checks.items() if check.result()
+        )
+        return [str(file_path) for file_path in agent_files]
 
     def _is_agent_file(self, file_path: Path) -> bool:
         """Check if a file likely contains agent code."""
@@ -134,28 +871,7 @@ class TestGenerator:
             return False
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Look for agent-related patterns
-            agent_indicators = [
-                "agent",
-                "Agent",
-                "chain",
-                "Chain",
-                "llm",
-                "LLM",
-                "openai",
-                "anthropic",
-                "langchain",
-                "llama_index",
-            ]
-
-            content_lower = content.lower()
-            return any(
-                indicator.lower() in content_lower for indicator in agent_indicators
-            )
-
+            return _contains_agent_indicator(file_path)
         except Exception:
             return False
 
@@ -169,7 +885,146 @@ class TestGenerator:
         # Generate test cases using LLM or fallback
         test_cases = self._generate_test_cases_with_llm(agent_info, count)
 
-        # Format the output
+        return self._format_test_cases(agent_info, test_cases, format)
+
+    def generate_tests_batch(
+        self, agent_paths: List[str], count: int = 5, format: str = "python"
+    ) -> Dict[str, str]:
+        """
+        Generate test cases for several agents with batched LLM calls.
+
+        Up to BATCH_MAX_AGENTS agents share each call, and the calls run
+        concurrently. Agents missing from a batched response are generated
+        individually.
+
+        Returns:
+            Formatted tests keyed by agent path
+        """
+        agent_infos = [self._analyze_agent(agent_path) for agent_path in agent_paths]
+
+        batched_cases: Dict[int, List[Dict[str, Any]]] = {}
+        if self.llm_client is not None and len(agent_infos) > 1:
+            offsets = range(0, len(agent_infos), BATCH_MAX_AGENTS)
+            groups = [agent_infos[i : i + BATCH_MAX_AGENTS] for i in offsets]
+            group_results = self._map_concurrently(
+                lambda group: self._generate_batched_test_cases(group, count), groups
+            )
+            for offset, group_cases in zip(offsets, group_results):
+                for i, test_cases in group_cases.items():
+                    batched_cases[offset + i] = test_cases
+
+        # Agents the batch didn't cover get their own requests, issued concurrently
+        missing = [
+            agent_info
+            for i, agent_info in enumerate(agent_infos, 1)
+            if not batched_cases.get(i)
+        ]
+        individual_cases = iter(
+            self._map_concurrently(
+                lambda agent_info: self._generate_test_cases_with_llm(
+                    agent_info, count
+                ),
+                missing,
+            )
+        )
+
+        generated = {}
+        for i, (agent_path, agent_info) in enumerate(zip(agent_paths, agent_infos), 1):
+            test_cases = batched_cases.get(i)
+            if test_cases:
+                test_cases = test_cases[:count]
+            else:
+                test_cases = next(individual_cases)
+            generated[agent_path] = self._format_test_cases(
+                agent_info, test_cases, format
+            )
+
+        return generated
+
+    def _generate_batched_test_cases(
+        self, agent_infos: List[Dict[str, Any]], count: int
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Generate test cases for a group of agents with one LLM call."""
+        # A lone agent is better served by the streaming, cached single path
+        if len(agent_infos) <= 1:
+            return {}
+
+        try:
+            prompt = self._create_batched_prompt(agent_infos, count)
+            response = self._get_llm_response(prompt)
+            return self._parse_batched_test_cases(response)
+        except Exception as e:
+            print(f"Warning: Batched LLM generation failed: {e}")
+            return {}
+
+    def generate_tests_package(
+        self, package_path: str, count: int = 5, format: str = "python"
+    ) -> Dict[str, str]:
+        """
+        Generate test cases for every agent in a package with a batched LLM call.
+
+        Returns:
+            Formatted tests keyed by agent path
+        """
+        agent_paths = self.discover_agents([package_path])
+        if not agent_paths:
+            return {}
+
+        return self.generate_tests_batch(agent_paths, count, format)
+
+    def generate_tests_many(
+        self,
+        agent_paths: List[str],
+        count: int = 5,
+        format: str = "python",
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+    ) -> Dict[str, str]:
+        """
+        Generate test cases for several agents with one LLM call each.
+
+        Unlike generate_tests_batch, every agent keeps its own prompt; the calls
+        run concurrently, at most max_concurrency at a time. An agent that
+        can't be generated (e.g. a file that fails to parse) is reported and
+        left out, without discarding the others.
+
+        Returns:
+            Formatted tests keyed by agent path
+        """
+
+        def generate(agent_path: str) -> Optional[str]:
+            try:
+                return self.generate_tests(agent_path, count, format)
+            except GenerationError as e:
+                print(f"Warning: Skipping {agent_path}: {e}")
+                return None
+
+        generated = self._map_concurrently(generate, agent_paths, max_concurrency)
+        return {
+            agent_path: tests
+            for agent_path, tests in zip(agent_paths, generated)
+            if tests is not None
+        }
+
+    def _map_concurrently(
+        self,
+        func: Callable[[Any], Any],
+        items: List[Any],
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+    ) -> List[Any]:
+        """Apply func to items on a thread pool, keeping the input order."""
+        if len(items) <= 1:
+            return [func(item) for item in items]
+
+        # LLM calls are network-bound, so threads overlap their latency
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(items))
+        ) as executor:
+            return list(executor.map(func, items))
+
+    def _format_test_cases(
+        self, agent_info: Dict[str, Any], test_cases: List[Dict[str, Any]], format: str
+    ) -> str:
+        """Format generated test cases in the requested output format."""
         if format == "python":
             return self._format_as_python(agent_info, test_cases)
         elif format == "yaml":
@@ -187,88 +1042,158 @@ class TestGenerator:
             raise GenerationError(f"Agent file not found: {agent_path}")
 
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                source_code = f.read()
-
-            # Parse the AST
-            tree = ast.parse(source_code)
-
-            # Extract information
-            info = {
-                "file_path": str(file_path),
-                "module_name": file_path.stem,
-                "source_code": source_code,
-                "functions": [],
-                "classes": [],
-                "imports": [],
-                "docstring": ast.get_docstring(tree) or "",
-                "project_structure": self._analyze_project_structure(file_path),
-                "import_analysis": self._analyze_imports_and_dependencies(
-                    file_path, tree
-                ),
+            source_key = _source_key(file_path)
+            cached = self._analysis_cache.get(source_key[0])
+            if cached is not None and cached[0] == source_key:
+                # Callers get their own copy, so the cached analysis stays intact
+                return copy.deepcopy(cached[1])
+
+            # Analyses saved by earlier runs skip reading and parsing the file
+            cache_path = self._analysis_cache_path(source_key)
+            info = self._load_cached_analysis(cache_path)
+
+            if info is None:
+                info = self._extract_agent_info(file_path, source_key)
+                self._save_cached_analysis(cache_path, info)
+            else:
+                # The project layout can change while the file doesn't, so
+                # what's derived from it is recomputed
+                info["file_path"] = str(file_path)
+                info["project_structure"] = self._analyze_project_structure(file_path)
+                info["import_analysis"]["required_for_tests"] = (
+                    self._determine_test_imports(file_path, info["import_analysis"])
+                )
+
+            self._analysis_cache[source_key[0]] = (source_key, info)
+            return copy.deepcopy(info)
+
+        except Exception as e:
+            raise GenerationError(f"Failed to analyze agent: {str(e)}")
+
+    def _extract_agent_info(
+        self, file_path: Path, source_key: Tuple[str, int, int]
+    ) -> Dict[str, Any]:
+        """Extract an agent's functions, classes, imports and project context."""
+        # Source and AST are cached, so files already seen aren't re-read
+        source_code = _read_source(*source_key)
+        tree = _parse_source(*source_key)
+
+        # Extract information
+        info = {
+            "file_path": str(file_path),
+            "module_name": file_path.stem,
+            # Only the prompt's excerpt is kept, not the whole file, so
+            # analyses held at once don't each pin a copy of their source
+            "source_excerpt": _head_lines(source_code, PROMPT_SOURCE_LINES),
+            "functions": [],
+            "public_functions": [],
+            "classes": [],
+            "imports": [],
+            "docstring": ast.get_docstring(tree) or "",
+            "project_structure": self._analyze_project_structure(file_path),
+            "import_analysis": self._analyze_imports_and_dependencies(file_path, tree),
+        }
+
+        # Extract functions, classes and imports
+        visitor = _AgentStructureVisitor()
+        visitor.visit(tree)
+        info["imports"] = visitor.imports
+
+        for node in visitor.functions:
+            func_info = {
+                "name": node.name,
+                "docstring": ast.get_docstring(node) or "",
+                "args": [arg.arg for arg in node.args.args],
+                "returns": _annotation_source(node.returns),
+                "is_public": not node.name.startswith("_"),
+                "is_standalone": True,  # Top-level function
+                "signature": self._extract_function_signature(node),
+            }
+            info["functions"].append(func_info)
+            if func_info["is_public"]:
+                info["public_functions"].append(func_info)
+
+        for node in visitor.classes:
+            class_info = {
+                "name": node.name,
+                "docstring": ast.get_docstring(node) or "",
+                "methods": [],
+                "public_methods": [],
+                "is_public": not node.name.startswith("_"),
+                "constructor_args": None,
             }
 
-            # Extract functions and classes
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    func_info = {
-                        "name": node.name,
-                        "docstring": ast.get_docstring(node) or "",
-                        "args": [arg.arg for arg in node.args.args],
-                        "returns": (
-                            getattr(node.returns, "id", None) if node.returns else None
-                        ),
-                        "is_public": not node.name.startswith("_"),
-                        "is_standalone": True,  # Top-level function
-                        "signature": self._extract_function_signature(node),
-                    }
-                    info["functions"].append(func_info)
-
-                elif isinstance(node, ast.ClassDef):
-                    class_info = {
-                        "name": node.name,
-                        "docstring": ast.get_docstring(node) or "",
-                        "methods": [],
-                        "is_public": not node.name.startswith("_"),
-                        "constructor_args": None,
+            # Extract methods and constructor
+            for item in node.body:
+                if isinstance(item, ast.FunctionDef):
+                    method_info = {
+                        "name": item.name,
+                        "docstring": ast.get_docstring(item) or "",
+                        "args": [arg.arg for arg in item.args.args],
+                        "is_public": not item.name.startswith("_"),
+                        "is_constructor": item.name == "__init__",
+                        "signature": self._extract_function_signature(item),
                     }
+                    class_info["methods"].append(method_info)
+                    if method_info["is_public"]:
+                        class_info["public_methods"].append(method_info)
 
-                    # Extract methods and constructor
-                    for item in node.body:
-                        if isinstance(item, ast.FunctionDef):
-                            method_info = {
-                                "name": item.name,
-                                "docstring": ast.get_docstring(item) or "",
-                                "args": [arg.arg for arg in item.args.args],
-                                "is_public": not item.name.startswith("_"),
-                                "is_constructor": item.name == "__init__",
-                                "signature": self._extract_function_signature(item),
-                            }
-                            class_info["methods"].append(method_info)
-
-                            # Store constructor arguments for object creation
-                            if item.name == "__init__":
-                                class_info["constructor_args"] = [
-                                    arg.arg
-                                    for arg in item.args.args
-                                    if arg.arg != "self"
-                                ]
-
-                    info["classes"].append(class_info)
-
-                elif isinstance(node, ast.Import):
-                    for alias in node.names:
-                        info["imports"].append(alias.name)
-
-                elif isinstance(node, ast.ImportFrom):
-                    module = node.module or ""
-                    for alias in node.names:
-                        info["imports"].append(f"{module}.{alias.name}")
-
-            return info
+                    # Store constructor arguments for object creation
+                    if item.name == "__init__":
+                        class_info["constructor_args"] = [
+                            arg.arg for arg in item.args.args if arg.arg != "self"
+                        ]
 
-        except Exception as e:
-            raise GenerationError(f"Failed to analyze agent: {str(e)}")
+            info["classes"].append(class_info)
+
+        return info
+
+    def _analysis_cache_path(self, source_key: Tuple[str, int, int]) -> Optional[Path]:
+        """Get the on-disk cache file for an analysis, or None if disabled."""
+        testing = self.config.testing
+        if not testing.analysis_cache:
+            return None
+
+        path, mtime_ns, size = source_key
+        key_source = (
+            f"{ANALYSIS_CACHE_VERSION}|{os.path.abspath(path)}|{mtime_ns}|{size}"
+        )
+        key = hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).hexdigest()
+        return Path(testing.cache_dir) / ANALYSIS_CACHE_DIR / f"{key}.json"
+
+    def _load_cached_analysis(
+        self, cache_path: Optional[Path]
+    ) -> Optional[Dict[str, Any]]:
+        """Load a saved analysis, or None on a cache miss."""
+        if cache_path is None:
+            return None
+
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return info if isinstance(info, dict) else None
+
+    def _save_cached_analysis(
+        self, cache_path: Optional[Path], info: Dict[str, Any]
+    ) -> None:
+        """Write an analysis to the on-disk cache atomically."""
+        if cache_path is None:
+            return
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(info, f)
+            os.replace(temp_path, cache_path)
+        except (TypeError, ValueError):
+            # Default values that can't be stored as JSON; analyze every run
+            temp_path.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"Warning: Could not cache agent analysis: {e}")
 
     def _analyze_project_structure(self, file_path: Path) -> Dict[str, Any]:
         """Analyze project structure to understand import paths."""
@@ -286,7 +1211,7 @@ class TestGenerator:
             "project_root": str(project_root),
             "relative_path": str(relative_path),
             "module_path": module_path,
-            "package_structure": self._analyze_package_structure(project_root),
+            "package_structure": self._get_package_structure(project_root),
             "is_package": (project_root / "__init__.py").exists(),
         }
 
@@ -313,6 +1238,15 @@ class TestGenerator:
         # Fallback to current directory
         return file_path.parent
 
+    def _get_package_structure(self, project_root: Path) -> Dict[str, Any]:
+        """Get the package structure of a project, analyzing it only once."""
+        key = str(project_root)
+        if key not in self._package_structure_cache:
+            self._package_structure_cache[key] = self._analyze_package_structure(
+                project_root
+            )
+        return self._package_structure_cache[key]
+
     def _analyze_package_structure(self, project_root: Path) -> Dict[str, Any]:
         """Analyze package structure for better imports."""
         packages = []
@@ -342,7 +1276,8 @@ class TestGenerator:
             "required_for_tests": [],
         }
 
-        for node in ast.walk(tree):
+        # Imports are statements, so expressions needn't be walked
+        for node in _walk_statements(tree):
             if isinstance(node, ast.Import):
                 for alias in node.names:
                     import_type = self._classify_import(alias.name)
@@ -444,9 +1379,7 @@ class TestGenerator:
         for i, arg in enumerate(node.args.args):
             arg_info = {
                 "name": arg.arg,
-                "annotation": (
-                    getattr(arg.annotation, "id", None) if arg.annotation else None
-                ),
+                "annotation": _annotation_source(arg.annotation),
                 "has_default": i >= len(node.args.args) - len(node.args.defaults),
             }
             signature["args"].append(arg_info)
@@ -459,8 +1392,7 @@ class TestGenerator:
                 signature["defaults"].append("...")
 
         # Extract return annotation
-        if node.returns:
-            signature["return_annotation"] = getattr(node.returns, "id", None)
+        signature["return_annotation"] = _annotation_source(node.returns)
 
         return signature
 
@@ -474,8 +1406,18 @@ class TestGenerator:
 
         try:
             prompt = self._create_generation_prompt(agent_info, count)
-            response = self._get_llm_response(prompt)
-            test_cases = self._parse_llm_test_cases(response)
+            model = self._select_model(agent_info, prompt)
+
+            # Identical prompts to the same model reuse earlier test cases
+            cache_path = self._response_cache_path(prompt, model)
+            test_cases = self._load_cached_test_cases(cache_path)
+
+            if test_cases is None:
+                test_cases, response = self._stream_llm_test_cases(prompt, count, model)
+                if test_cases:
+                    self._save_cached_test_cases(cache_path, test_cases)
+                else:
+                    test_cases = self._parse_llm_test_cases(response)
 
             if not test_cases:
                 test_cases = self._create_enhanced_fallback_test_cases(
@@ -495,8 +1437,8 @@ class TestGenerator:
         test_cases = []
 
         # Test standalone functions
-        for func in agent_info["functions"]:
-            if func["is_public"] and func["is_standalone"]:
+        for func in agent_info["public_functions"]:
+            if func["is_standalone"]:
                 test_cases.extend(self._generate_function_tests(func, agent_info))
 
         # Test class methods
@@ -595,8 +1537,8 @@ class TestGenerator:
             )
 
         # Method tests
-        for method in cls["methods"]:
-            if method["is_public"] and not method["is_constructor"]:
+        for method in cls["public_methods"]:
+            if not method["is_constructor"]:
                 method_input = self._generate_method_input(method, cls)
                 tests.append(
                     {
@@ -733,8 +1675,45 @@ class TestGenerator:
         """Create prompt for LLM test case generation."""
 
         prompt_parts = [
-            "You are an expert test case generator for AI agents and Python code. Analyze the following code and generate comprehensive test cases.",
+            "Analyze the following code and generate comprehensive test cases.",
+            "",
+            *self._describe_agent(agent_info),
+            f"Generate {count} comprehensive test cases as a JSON array in the required format.",
+            "",
+            "Generate the JSON array now:",
+        ]
+
+        return "\n".join(prompt_parts)
+
+    def _create_batched_prompt(
+        self, agent_infos: List[Dict[str, Any]], count: int
+    ) -> str:
+        """Create a single prompt asking for test cases for several agents."""
+        prompt_parts = [
+            "Analyze each of the following agents and generate comprehensive test cases for each one.",
             "",
+        ]
+
+        for i, agent_info in enumerate(agent_infos, 1):
+            prompt_parts.extend(
+                [f"=== AGENT {i} ===", *self._describe_agent(agent_info)]
+            )
+
+        agent_keys = ", ".join(f'"agent_{i}"' for i in range(1, len(agent_infos) + 1))
+        prompt_parts.extend(
+            [
+                f"Generate {count} comprehensive test cases for EACH agent.",
+                f"Return a single JSON object with the keys {agent_keys}, where each value is an array of test cases for that agent in the required format.",
+                "",
+                "Generate the JSON object now:",
+            ]
+        )
+
+        return "\n".join(prompt_parts)
+
+    def _describe_agent(self, agent_info: Dict[str, Any]) -> List[str]:
+        """Describe an agent's code for a generation prompt."""
+        prompt_parts = [
             "AGENT INFORMATION:",
             f"File: {agent_info['file_path']}",
             f"Module: {agent_info['module_name']}",
@@ -746,88 +1725,217 @@ class TestGenerator:
             prompt_parts.extend(["AGENT DESCRIPTION:", agent_info["docstring"], ""])
 
         # Add source code excerpt for better context
-        source_lines = agent_info["source_code"].split("\n")[:50]  # First 50 lines
         prompt_parts.extend(
-            ["CODE SAMPLE (first 50 lines):", "```python", *source_lines, "```", ""]
+            [
+                f"CODE SAMPLE (first {PROMPT_SOURCE_LINES} lines):",
+                "```python",
+                *agent_info["source_excerpt"],
+                "```",
+                "",
+            ]
         )
 
         if agent_info["functions"]:
-            prompt_parts.extend(
-                [
-                    "PUBLIC FUNCTIONS TO TEST:",
-                    *[
-                        f"- {func['name']}({', '.join(func['args'])}): {func['docstring']}"
-                        for func in agent_info["functions"]
-                        if func["is_public"]
-                    ],
-                    "",
-                ]
-            )
+            prompt_parts.append("PUBLIC FUNCTIONS TO TEST:")
+            for func in agent_info["public_functions"]:
+                prompt_parts.append(_describe_function(func, "- "))
+            prompt_parts.append("")
 
         if agent_info["classes"]:
-            prompt_parts.extend(
-                [
-                    "CLASSES TO TEST:",
-                ]
-            )
+            prompt_parts.append("CLASSES TO TEST:")
             for cls in agent_info["classes"]:
-                if cls["is_public"]:
-                    prompt_parts.append(f"- {cls['name']}: {cls['docstring']}")
-                    public_methods = [m for m in cls["methods"] if m["is_public"]]
-                    if public_methods:
-                        prompt_parts.extend(
-                            [
-                                "  Methods:",
-                                *[
-                                    f"    - {method['name']}({', '.join(method['args'])}): {method['docstring']}"
-                                    for method in public_methods
-                                ],
-                            ]
-                        )
+                if not cls["is_public"]:
+                    continue
+                prompt_parts.append(f"- {cls['name']}: {cls['docstring']}")
+                if cls["public_methods"]:
+                    prompt_parts.append("  Methods:")
+                    for method in cls["public_methods"]:
+                        prompt_parts.append(_describe_function(method, "    - "))
             prompt_parts.append("")
 
-        prompt_parts.extend(
+        return prompt_parts
+
+    def _select_model(self, agent_info: Dict[str, Any], prompt: str) -> str:
+        """Pick the model for an agent, using the fast model for simple agents."""
+        fast_model = self.config.llm.fast_model
+        if not fast_model:
+            return self.model
+
+        complexity = len(agent_info["functions"]) + 3 * len(agent_info["classes"])
+        if (
+            complexity <= FAST_MODEL_MAX_COMPLEXITY
+            and len(prompt) <= FAST_MODEL_MAX_PROMPT_CHARS
+        ):
+            return fast_model
+        return self.model
+
+    def _stream_llm_test_cases(
+        self, prompt: str, count: int, model: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Stream an LLM response, parsing test cases as they complete.
+
+        Stops reading once count test cases have arrived. If none could be
+        parsed, the whole response is read.
+
+        Returns:
+            Tuple of (parsed test cases, response text read so far)
+        """
+        chunks: List[str] = []
+
+        def record(stream: Iterator[str]) -> Iterator[str]:
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+
+        test_cases: List[Dict[str, Any]] = []
+        stream = self._stream_llm_response(prompt, model or self.model)
+        recorded = record(stream)
+        try:
+            for case in _iter_json_array_items(recorded):
+                test_cases.extend(self._validate_test_cases([case]))
+                if len(test_cases) >= count:
+                    break
+
+            if not test_cases:
+                # Callers fall back to parsing the text, which needs all of it
+                for _ in recorded:
+                    pass
+        finally:
+            # Closing the generator closes the provider's stream early
+            stream.close()
+
+        return test_cases, "".join(chunks)
+
+    def _response_cache_path(self, prompt: str, model: str) -> Optional[Path]:
+        """Get the cache file for a prompt, or None if caching is disabled."""
+        llm = self.config.llm
+        if not llm.cache_responses:
+            return None
+
+        # Any setting that changes the output is part of the key
+        key_source = "|".join(
             [
-                f"Generate {count} comprehensive test cases in the following EXACT JSON format:",
-                "[",
-                "  {",
-                '    "name": "test_function_name_descriptive",',
-                '    "description": "Clear description of what this test validates",',
-                '    "function_to_test": "actual_function_name_from_code",',
-                '    "input_data": {"key": "value"},',
-                '    "expected_behavior": "What should happen",',
-                '    "evaluation_criteria": {',
-                '      "accuracy": "Response should be accurate and relevant",',
-                '      "format": "Output should be in correct format",',
-                '      "error_handling": "Should handle errors gracefully"',
-                "    },",
-                '    "tags": ["category", "priority"]',
-                "  }",
-                "]",
-                "",
-                "REQUIREMENTS:",
-                "1. Use ACTUAL function names from the code above",
-                "2. Create realistic input data based on function signatures",
-                "3. Include specific evaluation criteria (3-5 criteria per test)",
-                "4. Cover these scenarios:",
-                "   - Normal operation with typical inputs",
-                "   - Edge cases (empty, null, boundary values)",
-                "   - Error conditions (invalid inputs, exceptions)",
-                "   - Performance considerations (large inputs)",
-                "   - Integration scenarios (if applicable)",
-                "",
-                "5. Make test names descriptive and follow Python naming conventions",
-                "6. Ensure evaluation criteria are specific and measurable",
-                "7. Use appropriate tags: ['basic', 'edge_case', 'error_handling', 'performance', 'integration']",
-                "",
-                "Generate the JSON array now:",
+                llm.provider,
+                model,
+                str(llm.temperature),
+                str(llm.max_tokens),
+                GENERATION_SYSTEM_PROMPT,
+                prompt,
             ]
         )
+        key = hashlib.blake2b(key_source.encode("utf-8"), digest_size=16).hexdigest()
+        return Path(llm.cache_dir).expanduser() / f"{key}.json"
 
-        return "\n".join(prompt_parts)
+    def _load_cached_test_cases(
+        self, cache_path: Optional[Path]
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Load cached test cases, or None on a cache miss."""
+        if cache_path is None:
+            return None
+
+        try:
+            with open(cache_path, "rb") as f:
+                ttl = self.config.llm.cache_ttl
+                if (
+                    ttl is not None
+                    and time.time() - os.fstat(f.fileno()).st_mtime > ttl
+                ):
+                    return None
+                test_cases = _json_loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+        return test_cases if isinstance(test_cases, list) else None
+
+    def _save_cached_test_cases(
+        self, cache_path: Optional[Path], test_cases: List[Dict[str, Any]]
+    ) -> None:
+        """Write test cases to the cache atomically."""
+        if cache_path is None:
+            return
+
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(temp_path, "wb") as f:
+                f.write(_json_dumps(test_cases))
+            os.replace(temp_path, cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Warning: Could not cache LLM response: {e}")
+
+    def _stream_llm_response(self, prompt: str, model: str) -> Iterator[str]:
+        """Stream response text from the LLM."""
+        self._throttle.wait()
+        provider = self.config.llm.provider
+
+        if provider == "openai":
+            return self._stream_openai_response(prompt, model)
+        elif provider == "anthropic":
+            return self._stream_anthropic_response(prompt, model)
+        elif provider == "gemini":
+            return self._stream_gemini_response(prompt, model)
+        else:
+            raise GenerationError(f"Unsupported provider: {provider}")
+
+    def _stream_openai_response(self, prompt: str, model: str) -> Iterator[str]:
+        """Stream response text from OpenAI."""
+        stream = self.llm_client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": GENERATION_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=self.config.llm.temperature,
+            max_tokens=self.config.llm.max_tokens or 3000,
+            stream=True,
+        )
+
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()
+
+    def _stream_anthropic_response(self, prompt: str, model: str) -> Iterator[str]:
+        """Stream response text from Anthropic."""
+        with self.llm_client.messages.stream(
+            model=model,
+            max_tokens=self.config.llm.max_tokens or 3000,
+            temperature=self.config.llm.temperature,
+            system=ANTHROPIC_SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}],
+        ) as stream:
+            yield from stream.text_stream
+
+    def _stream_gemini_response(self, prompt: str, model: str) -> Iterator[str]:
+        """Stream response text from Google Gemini."""
+        generation_config = {
+            "temperature": self.config.llm.temperature,
+            "max_output_tokens": self.config.llm.max_tokens or 3000,
+        }
+
+        # The Gemini client is bound to one model, so other models get their own
+        client = self.llm_client
+        if model != self.model:
+            genai = _import_provider(
+                "google.generativeai", "Google Generative AI", "google-generativeai"
+            )
+            client = genai.GenerativeModel(model)
+
+        response = client.generate_content(
+            GENERATION_SYSTEM_PROMPT + "\n\n" + prompt,
+            generation_config=generation_config,
+            stream=True,
+        )
+
+        for chunk in response:
+            yield chunk.text
 
     def _get_llm_response(self, prompt: str) -> str:
         """Get response from LLM."""
+        self._throttle.wait()
         try:
             provider = self.config.llm.provider
 
@@ -848,13 +1956,7 @@ class TestGenerator:
         response = self.llm_client.chat.completions.create(
             model=self.model,
             messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert test case generator. Generate test cases in valid JSON format exactly as requested."
-                        + " Focus on creating realistic, comprehensive test cases."
-                    ),
-                },
+                {"role": "system", "content": GENERATION_SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
             temperature=self.config.llm.temperature,
@@ -869,6 +1971,7 @@ class TestGenerator:
             model=self.model,
             max_tokens=self.config.llm.max_tokens or 3000,
             temperature=self.config.llm.temperature,
+            system=ANTHROPIC_SYSTEM_BLOCKS,
             messages=[{"role": "user", "content": prompt}],
         )
 
@@ -883,11 +1986,7 @@ class TestGenerator:
         }
 
         # Add system instruction about being a test case generator
-        full_prompt = (
-            "You are an expert test case generator. Generate test cases in valid JSON format exactly as requested."
-            + " Focus on creating realistic, comprehensive test cases.\n\n"
-            + prompt
-        )
+        full_prompt = GENERATION_SYSTEM_PROMPT + "\n\n" + prompt
 
         response = self.llm_client.generate_content(
             full_prompt, generation_config=generation_config
@@ -898,40 +1997,12 @@ class TestGenerator:
     def _parse_llm_test_cases(self, response: str) -> List[Dict[str, Any]]:
         """Parse LLM response to extract test cases."""
         try:
-            import json
-            import re
-
             # Try to extract JSON array from response
-            json_match = re.search(r"\[.*\]", response, re.DOTALL)
-
-            if json_match:
-                json_str = json_match.group()
-                test_cases = json.loads(json_str)
+            test_cases = _load_first_json(response, "[")
 
+            if test_cases is not None:
                 # Validate and enhance test cases
-                validated_cases = []
-                for case in test_cases:
-                    if isinstance(case, dict) and "name" in case:
-                        # Ensure required fields exist
-                        enhanced_case = {
-                            "name": case.get("name", "test_unnamed"),
-                            "description": case.get(
-                                "description", "Generated test case"
-                            ),
-                            "function_to_test": case.get("function_to_test", ""),
-                            "input_data": case.get("input_data", case.get("input", {})),
-                            "expected_behavior": case.get(
-                                "expected_behavior", case.get("expected", "")
-                            ),
-                            "evaluation_criteria": case.get(
-                                "evaluation_criteria",
-                                {"accuracy": "Should work correctly"},
-                            ),
-                            "tags": case.get("tags", ["generated"]),
-                        }
-                        validated_cases.append(enhanced_case)
-
-                return validated_cases
+                return self._validate_test_cases(test_cases)
             else:
                 # Fallback: create basic test cases
                 return self._create_fallback_test_cases()
@@ -940,6 +2011,57 @@ class TestGenerator:
             print(f"Warning: Failed to parse LLM response: {e}")
             return self._create_fallback_test_cases()
 
+    def _parse_batched_test_cases(
+        self, response: str
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """
+        Parse a batched LLM response into test cases per agent.
+
+        Returns:
+            Test cases keyed by 1-based agent number; agents missing from the
+            response are left out
+        """
+        try:
+            batch = _load_first_json(response, "{")
+        except ValueError as e:
+            print(f"Warning: Failed to parse batched LLM response: {e}")
+            return {}
+
+        if not isinstance(batch, dict):
+            return {}
+
+        test_cases = {}
+        for key, cases in batch.items():
+            agent_number = str(key).rpartition("_")[2]
+            if agent_number.isdigit() and isinstance(cases, list):
+                test_cases[int(agent_number)] = self._validate_test_cases(cases)
+
+        return test_cases
+
+    def _validate_test_cases(self, test_cases: List[Any]) -> List[Dict[str, Any]]:
+        """Keep well-formed test cases and fill in missing fields."""
+        validated_cases = []
+        for case in test_cases:
+            if isinstance(case, dict) and "name" in case:
+                # Ensure required fields exist
+                enhanced_case = {
+                    "name": case.get("name", "test_unnamed"),
+                    "description": case.get("description", "Generated test case"),
+                    "function_to_test": case.get("function_to_test", ""),
+                    "input_data": case.get("input_data", case.get("input", {})),
+                    "expected_behavior": case.get(
+                        "expected_behavior", case.get("expected", "")
+                    ),
+                    "evaluation_criteria": case.get(
+                        "evaluation_criteria",
+                        {"accuracy": "Should work correctly"},
+                    ),
+                    "tags": case.get("tags", ["generated"]),
+                }
+                validated_cases.append(enhanced_case)
+
+        return validated_cases
+
     def _create_fallback_test_cases(self) -> List[Dict[str, Any]]:
         """Create basic fallback test cases."""
         return [
@@ -977,88 +2099,25 @@ class TestGenerator:
         """Format test cases as Python code."""
         template_path = Path(".agenttest") / "templates" / "test_template.py.j2"
 
-        if template_path.exists():
-            with open(template_path, "r") as f:
-                template_content = f.read()
-        else:
-            # Enhanced default template
-            template_content = '''"""
-Generated test for {{ agent_name }}.
-
-This test was automatically generated by AgentTest.
-"""
-
-from agent_test import agent_test
-{% if agent_module_path %}
-from {{ agent_module_path }} import *
-{% else %}
-# TODO: Import your agent functions here
-# from your_module import your_function
-{% endif %}
-
-
-{% for test_case in test_cases %}
-@agent_test(
-    criteria=[{% for criterion in test_case.evaluation_criteria.keys() %}"{{ criterion }}"{% if not loop.last %}, {% endif %}{% endfor %}],
-    tags={{ test_case.tags | tojson }}
-)
-def {{ test_case.name }}():
-    """{{ test_case.description }}"""
-    {% if test_case.input_data -%}
-    input_data = {{ test_case.input_data | tojson }}
-    {%- else -%}
-    input_data = {}
-    {%- endif %}
-    {% if test_case.expected_behavior -%}
-    expected_behavior = {{ test_case.expected_behavior | tojson }}
-    {%- endif %}
-
-    {% if test_case.function_to_test -%}
-    # Call the function being tested
-    {% if "." in test_case.function_to_test -%}
-    # Class method call
-    {% set class_method = test_case.function_to_test.split(".") -%}
-    {% if test_case.input_data.get("_class_instance") -%}
-    instance = {{ class_method[0] }}(**{{ test_case.input_data._class_instance.constructor_args | tojson }})
-    actual = instance.{{ class_method[1] }}({% for key, value in test_case.input_data.items() if key != "_class_instance" %}{{ key }}={{ value | tojson }}{% if not loop.last %}, {% endif %}{% endfor %})
-    {%- else -%}
-    # TODO: Create instance of {{ class_method[0] }} with appropriate arguments
-    # instance = {{ class_method[0] }}(api_key="your_api_key")
-    # actual = instance.{{ class_method[1] }}(**input_data)
-    actual = None
-    {%- endif %}
-    {%- else -%}
-    # Function call
-    {% if test_case.input_data -%}
-    actual = {{ test_case.function_to_test }}(**input_data)
-    {%- else -%}
-    actual = {{ test_case.function_to_test }}()
-    {%- endif %}
-    {%- endif %}
-    {%- else -%}
-    # TODO: Call your agent function here
-    # actual = your_agent_function(input_data)
-    actual = None  # Replace with actual function call
-    {%- endif %}
-
-    return {
-        "input": input_data,
-        {% if test_case.expected_behavior -%}
-        "expected_behavior": expected_behavior,
-        {%- endif %}
-        "actual": actual,
-        "evaluation_criteria": {{ test_case.evaluation_criteria | tojson }}
-    }
-
-{% endfor %}
-'''
-
-        template = Template(template_content)
-
         # Use the analyzed project structure for imports
         project_structure = agent_info.get("project_structure", {})
         agent_module_path = project_structure.get("module_path", None)
 
+        try:
+            # One stat both checks for the project template and keys its cache
+            template_content = _read_source(*_source_key(template_path))
+        except FileNotFoundError:
+            # The default template is rendered directly, skipping Jinja
+            rendered = _render_default_python(
+                agent_info["module_name"], agent_module_path, test_cases
+            )
+            if rendered is not None:
+                return rendered
+            template_content = DEFAULT_PYTHON_TEMPLATE
+
+        # Compiled templates are cached by source, so this only parses on change
+        template = _compile_template(template_content)
+
         return template.render(
             agent_name=agent_info["module_name"],
             agent_module_path=agent_module_path,
@@ -1069,26 +2128,33 @@ def {{ test_case.name }}():
         self, agent_info: Dict[str, Any], test_cases: List[Dict[str, Any]]
     ) -> str:
         """Format test cases as YAML."""
-        import yaml
-
         yaml_data = {
             "agent": agent_info["module_name"],
             "description": f"Generated tests for {agent_info['module_name']}",
             "test_cases": test_cases,
         }
 
-        return yaml.dump(yaml_data, default_flow_style=False, sort_keys=False)
+        return yaml.dump(
+            yaml_data, Dumper=YamlDumper, default_flow_style=False, sort_keys=False
+        )
 
     def _format_as_json(
         self, agent_info: Dict[str, Any], test_cases: List[Dict[str, Any]]
     ) -> str:
         """Format test cases as JSON."""
-        import json
-
         json_data = {
             "agent": agent_info["module_name"],
             "description": f"Generated tests for {agent_info['module_name']}",
             "test_cases": test_cases,
         }
 
+        if ORJSON_AVAILABLE:
+            try:
+                return orjson.dumps(
+                    json_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                ).decode("utf-8")
+            except TypeError:
+                # e.g. integers wider than 64 bits; the stdlib encoder handles these
+                pass
+
         return json.dumps(json_data, indent=2)
@@ -5,16 +5,52 @@ This file contains sample implementations of different types of AI agents
 that can be used to demonstrate AgentTest features.
 """
 
+import importlib.util
+import re
 from dataclasses import dataclass
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
-try:
-    import google.generativeai as genai
 
-    HAS_GOOGLE_GENAI = True
-except ImportError:
-    genai = None
-    HAS_GOOGLE_GENAI = False
+def _has_google_genai() -> bool:
+    """Check for the Google AI SDK without importing it."""
+    try:
+        return importlib.util.find_spec("google.generativeai") is not None
+    except ImportError:
+        return False
+
+
+# The SDK itself is imported only when an agent is created, so the keyword
+# helpers below stay cheap to import and work without it
+HAS_GOOGLE_GENAI = _has_google_genai()
+
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern":
+    """Compile keywords into one pattern matching any of them as a substring."""
+    return re.compile("|".join(map(re.escape, keywords)))
+
+
+# Query categories, checked in order; the first one with a matching keyword wins
+QUERY_CATEGORY_PATTERNS = (
+    ("billing", _keyword_pattern(["bill", "payment", "charge", "refund"])),
+    ("technical", _keyword_pattern(["bug", "error", "crash", "not working"])),
+    ("account", _keyword_pattern(["account", "login", "password", "access"])),
+    ("product", _keyword_pattern(["feature", "how to", "documentation"])),
+)
+
+ESCALATION_PATTERN = _keyword_pattern(
+    [
+        "frustrated",
+        "angry",
+        "cancel",
+        "lawsuit",
+        "lawyer",
+        "terrible",
+        "worst",
+        "hate",
+        "refund",
+        "money back",
+    ]
+)
 
 
 # Customer Support Agent
@@ -38,6 +74,8 @@ class CustomerSupportAgent:
                 "google-generativeai is required for GoogleAI agent. "
                 "Install with: pip install 'agenttest[google]'"
             )
+        import google.generativeai as genai
+
         genai.configure(api_key=api_key)
         self.model = genai.GenerativeModel("gemini-1.5-flash")
 
@@ -51,47 +89,17 @@ class CustomerSupportAgent:
 
     def classify_query(self, query: str) -> str:
         """Classify the customer query into categories."""
-        query_lower = query.lower()
-
-        if any(word in query_lower for word in ["bill", "payment", "charge", "refund"]):
-            return "billing"
-        elif any(
-            word in query_lower for word in ["bug", "error", "crash", "not working"]
-        ):
-            return "technical"
-        elif any(
-            word in query_lower for word in ["account", "login", "password", "access"]
-        ):
-            return "account"
-        elif any(
-            word in query_lower for word in ["feature", "how to", "documentation"]
-        ):
-            return "product"
-        else:
-            return "general"
+        return classify_query(query)
 
     def should_escalate(self, query: CustomerQuery) -> bool:
         """Determine if query should be escalated to human agent."""
-        escalation_keywords = [
-            "frustrated",
-            "angry",
-            "cancel",
-            "lawsuit",
-            "lawyer",
-            "terrible",
-            "worst",
-            "hate",
-            "refund",
-            "money back",
-        ]
-
         if query.urgency == "critical":
             return True
 
         if query.customer_type == "enterprise" and query.urgency == "high":
             return True
 
-        if any(keyword in query.query.lower() for keyword in escalation_keywords):
+        if ESCALATION_PATTERN.search(query.query.lower()):
             return True
 
         return False
@@ -132,6 +140,8 @@ class CustomerSupportAgent:
         """
 
         try:
+            import google.generativeai as genai
+
             response = self.model.generate_content(
                 prompt,
                 generation_config=genai.types.GenerationConfig(
@@ -200,15 +210,8 @@ def classify_query(query: str) -> str:
     """Classify a query without needing API key or Google AI."""
     query_lower = query.lower()
 
-    if any(word in query_lower for word in ["bill", "payment", "charge", "refund"]):
-        return "billing"
-    elif any(word in query_lower for word in ["bug", "error", "crash", "not working"]):
-        return "technical"
-    elif any(
-        word in query_lower for word in ["account", "login", "password", "access"]
-    ):
-        return "account"
-    elif any(word in query_lower for word in ["feature", "how to", "documentation"]):
-        return "product"
-    else:
-        return "general"
+    for category, pattern in QUERY_CATEGORY_PATTERNS:
+        if pattern.search(query_lower):
+            return category
+
+    return "general"
@@ -4,15 +4,29 @@ Tests for AgentTest core functionality.
 These are pytest tests for the framework itself.
 """
 
+import random
+import sys
 import tempfile
+import textwrap
 from pathlib import Path
 
 import pytest
 
 from agent_test.core.config import Config
 from agent_test.core.decorators import TestResult, TestResults, agent_test
+from agent_test.core.git_logger import GitLogger
+from agent_test.core.runner import TestRunner as Runner
 from agent_test.evaluators.base import EvaluationResult, StringSimilarityEvaluator
 from agent_test.evaluators.registry import EvaluatorRegistry
+from agent_test.generators.test_generator import (
+    DEFAULT_PYTHON_TEMPLATE,
+    _compile_template,
+    _extract_first_json,
+    _iter_json_array_items,
+    _load_first_json,
+    _render_default_python,
+)
+from agent_test.utils.exceptions import TestDiscoveryError as DiscoveryError
 
 
 class TestConfig:
@@ -133,6 +147,87 @@ class TestEvaluators:
         assert result.passed is True  # Should pass when no expected value
         assert result.score == 1.0
 
+    def test_string_similarity_batch_matches_single(self):
+        """Test batched cosine scores match per-case scores."""
+        evaluator = StringSimilarityEvaluator({"method": "cosine", "threshold": 0.5})
+
+        test_cases = [
+            {"actual": "the cat sat on the mat", "expected": "a cat sat on a mat"},
+            {"actual": "hello world", "expected": "hello world"},
+            {"actual": "quick brown fox", "expected": "lazy dog"},
+        ]
+
+        result = evaluator.evaluate(test_cases)
+        individual = result.details["individual_results"]
+
+        for case, case_result in zip(test_cases, individual):
+            single = evaluator.evaluate(case)
+            assert case_result["score"] == pytest.approx(single.score)
+
+    def test_cosine_empty_vocabulary_scores_zero(self):
+        """Test pairs without word tokens score 0.0 alone and in a batch."""
+        evaluator = StringSimilarityEvaluator({"method": "cosine", "threshold": 0.5})
+
+        assert evaluator._cosine_similarity("!!", "??") == 0.0
+        assert evaluator._batch_cosine_similarity([("!!", "??"), ("?", "!")]) == [
+            0.0,
+            0.0,
+        ]
+
+        test_cases = [
+            {"actual": "!!", "expected": "??"},
+            {"actual": "hello world", "expected": "hello there"},
+        ]
+        individual = evaluator.evaluate(test_cases).details["individual_results"]
+
+        for case, case_result in zip(test_cases, individual):
+            assert case_result["score"] == pytest.approx(evaluator.evaluate(case).score)
+        assert individual[0]["score"] == 0.0
+
+    def test_levenshtein_similarity(self):
+        """Test Levenshtein similarity evaluation."""
+        evaluator = StringSimilarityEvaluator({"method": "levenshtein"})
+
+        assert evaluator._levenshtein_similarity("kitten", "sitting") == pytest.approx(
+            1.0 - 3 / 7
+        )
+        assert evaluator._levenshtein_similarity("", "") == 1.0
+        assert evaluator._levenshtein_similarity("abc", "") == 0.0
+
+    @pytest.mark.parametrize("use_numba", [False, True], ids=["myers", "numba"])
+    def test_levenshtein_distance_matches_reference(self, monkeypatch, use_numba):
+        """Test every Levenshtein path against a plain DP, including long strings."""
+        from agent_test.evaluators import base
+
+        if use_numba:
+            if base._numba_levenshtein() is None:
+                pytest.skip("numba is not installed")
+        else:
+            # Strings over MYERS_MAX_LENGTH fall back to multi-word Myers
+            monkeypatch.setattr(base, "_numba_levenshtein", lambda: None)
+
+        def reference(a, b):
+            previous = list(range(len(b) + 1))
+            for i, char_a in enumerate(a, 1):
+                current = [i]
+                for j, char_b in enumerate(b, 1):
+                    current.append(
+                        min(
+                            previous[j] + 1,
+                            current[j - 1] + 1,
+                            previous[j - 1] + (char_a != char_b),
+                        )
+                    )
+                previous = current
+            return previous[-1]
+
+        rng = random.Random(0)
+        alphabet = "abcé日🙂"
+        for _ in range(300):
+            a = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            b = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 150)))
+            assert base._levenshtein_distance(a, b) == reference(a, b), (a, b)
+
     def test_evaluator_registry(self):
         """Test evaluator registry."""
         config = Config.create_default("basic")
@@ -150,6 +245,568 @@ class TestEvaluators:
         assert registry.get_evaluator("custom") is custom_evaluator
 
 
+class TestGitLogger:
+    """Test git-aware result logging."""
+
+    def test_history_includes_journaled_runs(self):
+        """Test runs appended to the index journal show up in history."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = Config.create_default("basic")
+            config.logging.results_dir = temp_dir
+            config.logging.git_aware = False
+            logger = GitLogger(config)
+
+            for score in (0.5, 0.9):
+                results = TestResults()
+                results.add_result(TestResult(test_name="t", passed=True, score=score))
+                logger.log_results(results)
+
+            assert (Path(temp_dir) / "index.jsonl").exists()
+            assert len(logger.get_history(limit=10)) == 2
+
+            # Compaction folds the journal into index.json
+            logger._compact_index()
+            assert not (Path(temp_dir) / "index.jsonl").exists()
+            assert len(logger.get_history(limit=10)) == 2
+
+
+class TestRunnerExecution:
+    """Test the test runner."""
+
+    def test_parallel_run_preserves_order(self):
+        """Test parallel execution returns results in discovery order."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_file = Path(temp_dir) / "test_parallel.py"
+            test_file.write_text(textwrap.dedent("""
+                    import time
+
+                    from agent_test import agent_test
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_slow():
+                        time.sleep(0.2)
+                        return {"actual": "slow result", "expected": "slow result"}
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_fast():
+                        return {"actual": "fast result", "expected": "fast result"}
+                    """))
+
+            config = Config.create_default("basic")
+            config.testing.parallel = True
+            results = Runner(config).run_tests(path=test_file)
+
+            assert [r.test_name for r in results.test_results] == [
+                "test_slow",
+                "test_fast",
+            ]
+            assert not results.has_failures()
+
+    def test_metadata_config_reflects_each_run(self):
+        """Test every run records the config as it was, in its own dict."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            test_file = Path(temp_dir) / "test_meta.py"
+            test_file.write_text(textwrap.dedent("""
+                    from agent_test import agent_test
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_meta():
+                        return {"actual": "ok", "expected": "ok"}
+                    """))
+
+            config = Config.create_default("basic")
+            runner = Runner(config)
+            first = runner.run_tests(path=test_file)
+            config.testing.parallel = True
+            second = runner.run_tests(path=test_file)
+
+            assert first.metadata["config"]["testing"]["parallel"] is False
+            assert second.metadata["config"]["testing"]["parallel"] is True
+            assert first.metadata["config"] is not second.metadata["config"]
+
+    def test_keep_going_records_discovery_errors(self):
+        """Test a broken test file doesn't stop the rest from running."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "test_broken.py").write_text("import missing_module\n")
+            (Path(temp_dir) / "test_ok.py").write_text(textwrap.dedent("""
+                    from agent_test import agent_test
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_ok():
+                        return {"actual": "ok", "expected": "ok"}
+                    """))
+
+            runner = Runner(Config.create_default("basic"))
+            results = runner.run_tests(path=Path(temp_dir), keep_going=True)
+
+            assert [r.test_name for r in results.test_results] == ["test_ok"]
+            assert len(results.discovery_errors) == 1
+            assert results.discovery_errors[0]["file"].endswith("test_broken.py")
+            assert results.has_failures()
+
+    def test_late_discovery_error_cancels_pending_tests(self):
+        """Test a broken file found mid-run stops queued tests from starting."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            run_log = Path(temp_dir) / "runs.log"
+            ok_dir = Path(temp_dir) / "ok"
+            broken_dir = Path(temp_dir) / "broken"
+            ok_dir.mkdir()
+            broken_dir.mkdir()
+            (broken_dir / "test_broken.py").write_text("import missing_module\n")
+            (ok_dir / "test_ok.py").write_text(textwrap.dedent(f"""
+                    import time
+
+                    from agent_test import agent_test
+
+
+                    def record():
+                        with open({str(run_log)!r}, "a") as log:
+                            log.write("ran\\n")
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_first():
+                        record()
+                        time.sleep(0.3)
+                        return {{"actual": "ok", "expected": "ok"}}
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_second():
+                        record()
+                        return {{"actual": "ok", "expected": "ok"}}
+                    """))
+
+            config = Config.create_default("basic")
+            config.testing.parallel = True
+            config.testing.max_workers = 1
+            config.testing.test_dirs = [str(ok_dir), str(broken_dir)]
+
+            with pytest.raises(DiscoveryError):
+                Runner(config).run_tests()
+
+            # Only the test already running when discovery failed was finished
+            assert run_log.read_text().splitlines() == ["ran"]
+
+    def test_verbose_failure_formats_traceback_once(self, monkeypatch, capsys):
+        """Test a failing test's traceback is formatted once and reused."""
+        import agent_test.core.runner as runner_module
+        from agent_test.core.decorators import TestCase as Case
+
+        calls = []
+        format_exc = runner_module.traceback.format_exc
+
+        def counting_format_exc(*args, **kwargs):
+            calls.append(1)
+            return format_exc(*args, **kwargs)
+
+        monkeypatch.setattr(runner_module.traceback, "format_exc", counting_format_exc)
+
+        def test_boom():
+            raise ValueError("boom")
+
+        case = Case(name="test_boom", function=test_boom, criteria=["similarity"])
+        result = Runner(Config.create_default("basic")).execute_test(
+            case, verbose=True, buffer_output=True
+        )
+
+        assert not result.passed
+        assert len(calls) == 1
+        assert "ValueError: boom" in result.details["traceback"]
+        assert result.details["traceback"] in capsys.readouterr().out
+
+    def test_discovery_cache_defers_imports(self):
+        """Test cached discovery only imports a test file when a test runs."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            import_log = Path(temp_dir) / "imports.log"
+            test_file = Path(temp_dir) / "test_cached.py"
+            test_file.write_text(textwrap.dedent(f"""
+                    from agent_test import agent_test
+
+                    with open({str(import_log)!r}, "a") as log:
+                        log.write("imported\\n")
+
+
+                    @agent_test(criteria=["similarity"], tags=["cached"])
+                    def test_cached():
+                        return {{"actual": "cached", "expected": "cached"}}
+                    """))
+
+            def import_count():
+                return len(import_log.read_text().splitlines())
+
+            config = Config.create_default("basic")
+            config.testing.discovery_cache = True
+            config.testing.cache_dir = str(Path(temp_dir) / "cache")
+
+            Runner(config).discover_tests(test_file)
+            assert import_count() == 1
+
+            # A fresh runner rebuilds the tests from the cache without importing
+            runner = Runner(config)
+            test_cases = runner.discover_tests(test_file)
+            assert import_count() == 1
+            assert test_cases[0].tags == ["cached"]
+
+            result = runner.execute_test(test_cases[0])
+            assert result.passed
+            assert import_count() == 2
+
+    def test_parallel_cached_imports_find_sibling_modules(self, monkeypatch):
+        """Test lazy imports on worker threads keep their directory on sys.path."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in ("a", "b"):
+                (Path(temp_dir) / f"helper_{name}.py").write_text(f"VALUE = {name!r}\n")
+                # Discovery finishes while the slow import still holds the import
+                # lock, so the sibling import must not rely on its sys.path entry
+                (Path(temp_dir) / f"test_{name}.py").write_text(textwrap.dedent(f"""
+                        import time
+
+                        from agent_test import agent_test
+
+                        time.sleep(0.2)
+
+                        from helper_{name} import VALUE  # noqa: E402
+
+
+                        @agent_test(criteria=["similarity"])
+                        def test_{name}():
+                            return {{"actual": VALUE, "expected": {name!r}}}
+                        """))
+
+            config = Config.create_default("basic")
+            config.testing.parallel = True
+            config.testing.discovery_cache = True
+            config.testing.cache_dir = str(Path(temp_dir) / "cache")
+
+            Runner(config).discover_tests(Path(temp_dir))
+
+            # Helpers must be imported again by the lazily loaded test modules
+            monkeypatch.delitem(sys.modules, "helper_a", raising=False)
+            monkeypatch.delitem(sys.modules, "helper_b", raising=False)
+
+            results = Runner(config).run_tests(path=Path(temp_dir))
+
+            assert sorted(r.test_name for r in results.test_results) == [
+                "test_a",
+                "test_b",
+            ]
+            assert not results.has_failures(), [r.error for r in results.test_results]
+
+    def test_parallel_tests_import_siblings_after_discovery(self, monkeypatch):
+        """Test parallel tests can import sibling modules after discovery ends."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "helper_late.py").write_text("VALUE = 'late'\n")
+            # Discovery is long finished by the time the test body imports
+            (Path(temp_dir) / "test_late.py").write_text(textwrap.dedent("""
+                    import time
+
+                    from agent_test import agent_test
+
+
+                    @agent_test(criteria=["similarity"])
+                    def test_late():
+                        time.sleep(0.1)
+                        from helper_late import VALUE
+
+                        return {"actual": VALUE, "expected": "late"}
+                    """))
+
+            config = Config.create_default("basic")
+            config.testing.parallel = True
+            monkeypatch.delitem(sys.modules, "helper_late", raising=False)
+
+            results = Runner(config).run_tests(path=Path(temp_dir))
+
+            assert len(results.test_results) == 1
+            assert not results.has_failures(), [r.error for r in results.test_results]
+            assert temp_dir not in sys.path
+
+
+class TestGeneratorFormatting:
+    """Test generated test file formatting."""
+
+    def test_default_template_fast_path_matches_jinja(self):
+        """Test direct rendering matches the default Jinja template."""
+        test_cases = [
+            {
+                "name": "test_function_call",
+                "description": "Calls a function",
+                "function_to_test": "handle_query",
+                "input_data": {"query": "<hello> & 'bye'"},
+                "expected_behavior": "Should answer",
+                "evaluation_criteria": {"accuracy": "Correct", "format": "Text"},
+                "tags": ["basic"],
+            },
+            {
+                "name": "test_method_call",
+                "description": "Calls a method",
+                "function_to_test": "Agent.run",
+                "input_data": {
+                    "_class_instance": {"constructor_args": {"api_key": "k"}},
+                    "text": "hi",
+                },
+                "expected_behavior": "",
+                "evaluation_criteria": {"accuracy": "Correct"},
+                "tags": [],
+            },
+            {
+                "name": "test_no_function",
+                "description": "No function",
+                "function_to_test": "",
+                "input_data": {},
+                "expected_behavior": "",
+                "evaluation_criteria": {},
+                "tags": ["generated"],
+            },
+        ]
+
+        template = _compile_template(DEFAULT_PYTHON_TEMPLATE)
+        for module_path in ("agents.sample", None):
+            expected = template.render(
+                agent_name="sample",
+                agent_module_path=module_path,
+                test_cases=test_cases,
+            )
+            rendered = _render_default_python("sample", module_path, test_cases)
+            assert rendered == expected
+
+
+class TestGeneratorParsing:
+    """Test parsing of LLM responses into test cases."""
+
+    @staticmethod
+    def make_generator():
+        from agent_test.generators.test_generator import TestGenerator as Generator
+
+        # Bypass __init__, which needs an LLM client and API key
+        generator = Generator.__new__(Generator)
+        generator.config = Config.create_default("basic")
+        generator.model = generator.config.llm.model
+        return generator
+
+    def test_iter_json_array_items_skips_arrays_without_objects(self):
+        """Test a bracketed aside before the real array doesn't end parsing."""
+        items = list(_iter_json_array_items(['See [1] below: [{"name": "x"}]']))
+
+        assert items == [{"name": "x"}]
+
+    def test_iter_json_array_items_handles_split_chunks_and_strings(self):
+        """Test objects are decoded across chunk boundaries and string brackets."""
+        text = (
+            'Here you go:\n```json\n[{"name": "a", "note": "] } [ {"}, '
+            '{"bad": }, {"name": "b", "quote": "say \\"hi\\""}]\n```'
+            '\n[{"name": "ignored"}]'
+        )
+
+        items = list(_iter_json_array_items(list(text)))
+
+        assert items == [
+            {"name": "a", "note": "] } [ {"},
+            {"name": "b", "quote": 'say "hi"'},
+        ]
+
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ('[{"name": "a"}]', '[{"name": "a"}]'),
+            ('Sure:\n```json\n[{"name": "a"}]\n```', '[{"name": "a"}]'),
+            ('[{"name": "a ] ["}]', '[{"name": "a ] ["}]'),
+            ('[{"name": "say \\"]\\""}] tail', '[{"name": "say \\"]\\""}]'),
+            ('[{"name": "a"}] and also [1]', '[{"name": "a"}]'),
+            ('[{"name": "a"}', None),
+            ("no json here", None),
+        ],
+    )
+    def test_extract_first_json(self, text, expected):
+        """Test the first balanced array is found, ignoring string contents."""
+        assert _extract_first_json(text) == expected
+
+    def test_load_first_json(self):
+        """Test bare JSON, wrapped JSON and invalid JSON are handled."""
+        assert _load_first_json('  [{"name": "a"}]\n') == [{"name": "a"}]
+        # Starts and ends with brackets but isn't one value; the scan finds it
+        assert _load_first_json('[{"name": "a"}] and also [1]') == [{"name": "a"}]
+        assert _load_first_json('```\n{"agent_1": []}\n```', "{") == {"agent_1": []}
+        assert _load_first_json("nothing") is None
+        with pytest.raises(ValueError):
+            _load_first_json("[{'name': 'single quotes'}]")
+
+    def test_generate_tests_many_skips_unparsable_agents(self, capsys):
+        """Test one agent that fails to analyze doesn't discard the others."""
+        from agent_test.generators.test_generator import _RequestThrottle
+
+        generator = self.make_generator()
+        generator.llm_client = None
+        generator._analysis_cache = {}
+        generator._package_structure_cache = {}
+        generator._throttle = _RequestThrottle()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            good = Path(temp_dir) / "good_agent.py"
+            good.write_text("def handle_query(query):\n    return query\n")
+            broken = Path(temp_dir) / "broken_agent.py"
+            broken.write_text("def handle_query(query:\n")
+            generator.config.testing.cache_dir = str(Path(temp_dir) / "cache")
+
+            generated = generator.generate_tests_many([str(broken), str(good)], count=1)
+
+        assert list(generated) == [str(good)]
+        assert "handle_query" in generated[str(good)]
+        assert f"Skipping {broken}" in capsys.readouterr().out
+
+    def test_parse_batched_test_cases(self):
+        """Test batched replies are split per agent, leaving out missing ones."""
+        generator = self.make_generator()
+        response = (
+            "Here are the tests:\n```json\n"
+            '{"agent_1": [{"name": "test_one", "note": "}"}], '
+            '"agent_3": [{"name": "test_three"}, {"no_name": true}], '
+            '"agent_x": [{"name": "ignored"}], "agent_4": "not a list"}\n```'
+        )
+
+        test_cases = generator._parse_batched_test_cases(response)
+
+        assert sorted(test_cases) == [1, 3]
+        assert [case["name"] for case in test_cases[1]] == ["test_one"]
+        assert [case["name"] for case in test_cases[3]] == ["test_three"]
+
+    def test_parse_batched_test_cases_without_object(self):
+        """Test replies without a JSON object yield no test cases."""
+        generator = self.make_generator()
+
+        assert generator._parse_batched_test_cases("[1, 2]") == {}
+        assert generator._parse_batched_test_cases("Sorry, I can't.") == {}
+        assert generator._parse_batched_test_cases('{"agent_1": [}') == {}
+
+    def test_stream_reads_whole_response_when_nothing_parses(self):
+        """Test the fallback parser gets the full text, not a truncated prefix."""
+        generator = self.make_generator()
+        chunks = ["No tests [here]", " and more text", " at the end"]
+        closed = []
+
+        def fake_stream(prompt, model):
+            try:
+                yield from chunks
+            finally:
+                closed.append(True)
+
+        generator._stream_llm_response = fake_stream
+
+        test_cases, response = generator._stream_llm_test_cases("prompt", 3)
+
+        assert test_cases == []
+        assert response == "".join(chunks)
+        assert closed
+
+    def test_stream_stops_after_count_test_cases(self):
+        """Test streaming stops reading once enough test cases arrived."""
+        generator = self.make_generator()
+        chunks = ['[{"name": "a"}, ', '{"name": "b"}, ', '{"name": "c"}]']
+
+        def fake_stream(prompt, model):
+            yield from chunks
+
+        generator._stream_llm_response = fake_stream
+
+        test_cases, response = generator._stream_llm_test_cases("prompt", 2)
+
+        assert [case["name"] for case in test_cases] == ["a", "b"]
+        assert response == "".join(chunks[:2])
+
+
+class TestAgentDiscovery:
+    """Test discovery of agent files for test generation."""
+
+    def test_ripgrep_command_and_output_parsing(self, monkeypatch):
+        """Test the ripgrep command mirrors the Python scan and output is parsed."""
+        import subprocess
+
+        from agent_test.generators import test_generator
+
+        commands = []
+
+        def fake_run(command, **kwargs):
+            commands.append(command)
+            stdout = b"./pkg/agent.py\npkg/agent.py\nbot.py\n"
+            return subprocess.CompletedProcess(command, 0, stdout=stdout)
+
+        monkeypatch.setattr(test_generator.shutil, "which", lambda name: "/bin/rg")
+        monkeypatch.setattr(test_generator.subprocess, "run", fake_run)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            missing_dir = str(Path(temp_dir) / "missing")
+            agent_files = test_generator._ripgrep_agent_files([temp_dir, missing_dir])
+
+        assert agent_files == [Path("bot.py"), Path("pkg/agent.py")]
+
+        command = commands[0]
+        assert command[0] == "/bin/rg"
+        assert command[command.index("--") + 1 :] == [temp_dir]
+        for flag in ("--files-with-matches", "--ignore-case", "--hidden"):
+            assert flag in command
+        globs = [command[i + 1] for i, arg in enumerate(command) if arg == "--glob"]
+        assert {"*.py", "!.*/", "!test_*.py", "!__init__.py", "!venv/"} <= set(globs)
+        patterns = [
+            command[i + 1] for i, arg in enumerate(command) if arg == "--regexp"
+        ]
+        # "langchain" contains "chain", so it's never needed
+        assert "chain" in patterns and "langchain" not in patterns
+
+    def test_ripgrep_unavailable_or_failing_falls_back(self, monkeypatch):
+        """Test None is returned when ripgrep is missing or errors out."""
+        import subprocess
+
+        from agent_test.generators import test_generator
+
+        monkeypatch.setattr(test_generator.shutil, "which", lambda name: None)
+        assert test_generator._ripgrep_agent_files(["."]) is None
+
+        monkeypatch.setattr(test_generator.shutil, "which", lambda name: "/bin/rg")
+        monkeypatch.setattr(
+            test_generator.subprocess,
+            "run",
+            lambda command, **kwargs: subprocess.CompletedProcess(command, 2, b""),
+        )
+        assert test_generator._ripgrep_agent_files(["."]) is None
+
+    def test_python_scan_rules_and_order(self, monkeypatch):
+        """Test the Python scan's skip rules and sorted results."""
+        from agent_test.generators import test_generator
+
+        monkeypatch.setattr(test_generator.shutil, "which", lambda name: None)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            for relative in (
+                "z_agent.py",
+                "a_agent.py",
+                ".hidden_agent.py",
+                "test_agent.py",
+                "__init__.py",
+                ".venv/agent.py",
+                "build/agent.py",
+            ):
+                file_path = root / relative
+                file_path.parent.mkdir(parents=True, exist_ok=True)
+                file_path.write_text("from openai import OpenAI\n")
+            (root / "plain.py").write_text("x = 1\n")
+
+            generator = test_generator.TestGenerator.__new__(
+                test_generator.TestGenerator
+            )
+            agent_files = generator.discover_agents([temp_dir])
+
+        assert agent_files == [
+            str(root / name)
+            for name in (".hidden_agent.py", "a_agent.py", "z_agent.py")
+        ]
+
+
 class TestIntegration:
     """Integration tests."""
 